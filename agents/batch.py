@@ -0,0 +1,166 @@
+"""Batch rendering of many decks from a JSONL manifest in one process."""
+from __future__ import annotations
+
+import json
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO, Union
+
+from agents.outline_manager import OutlineParser
+from agents.pipeline import render_deck
+from agents.template_cache import TemplateCache
+from agents.template_loader import TemplateRegistry
+from config import settings
+from core.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class BatchJob:
+    job_id: str
+    template: Path
+    outline: List[str]
+    output: Path
+    title: Optional[str] = None
+    pages: int = 0
+    skip_images: bool = False
+
+    @classmethod
+    def from_dict(cls, payload: Dict, line_number: int) -> "BatchJob":
+        outline = payload.get("outline") or []
+        if isinstance(outline, str):
+            outline = [outline]
+        output = payload.get("output") or str(settings.OUTPUT_DIR / f"job_{line_number}" / settings.PRESENTATION_NAME)
+        return cls(
+            job_id=str(payload.get("id", line_number)),
+            template=Path(payload["template"]),
+            outline=list(outline),
+            output=Path(output),
+            title=payload.get("title"),
+            pages=int(payload.get("pages") or 0),
+            skip_images=bool(payload.get("skip_images", False)),
+        )
+
+
+@dataclass
+class BatchResult:
+    job_id: str
+    status: str
+    seconds: float
+    output: Optional[str] = None
+    slides: int = 0
+    images: int = 0
+    error: Optional[str] = None
+
+    def to_dict(self) -> Dict:
+        payload = {"id": self.job_id, "status": self.status, "seconds": round(self.seconds, 4)}
+        if self.status == "ok":
+            payload.update(output=self.output, slides=self.slides, images=self.images)
+        else:
+            payload["error"] = self.error
+        return payload
+
+
+@dataclass
+class BatchReport:
+    succeeded: int = 0
+    failed: int = 0
+    slides: int = 0
+    seconds: float = 0.0
+
+    @property
+    def decks_per_second(self) -> float:
+        total = self.succeeded + self.failed
+        return total / self.seconds if self.seconds else 0.0
+
+    def record(self, result: BatchResult) -> None:
+        if result.status == "ok":
+            self.succeeded += 1
+            self.slides += result.slides
+        else:
+            self.failed += 1
+
+
+def read_manifest(stream: Iterable[str]) -> Iterator[Union[BatchJob, BatchResult]]:
+    """Yield a job per manifest line, or an error result for lines that cannot be parsed."""
+    for line_number, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        try:
+            yield BatchJob.from_dict(json.loads(line), line_number)
+        except (ValueError, KeyError, TypeError, AttributeError) as exc:
+            logger.error("Invalid manifest line %d: %s", line_number, exc)
+            yield BatchResult(
+                job_id=str(line_number),
+                status="error",
+                seconds=0.0,
+                error=f"Invalid manifest entry: {type(exc).__name__}: {exc}",
+            )
+
+
+def emit_result(report: BatchReport, result: BatchResult, results: Optional[TextIO]) -> None:
+    report.record(result)
+    if results is not None:
+        results.write(json.dumps(result.to_dict(), ensure_ascii=False) + "\n")
+        results.flush()
+
+
+class BatchRunner:
+    def __init__(self, cache: Optional[TemplateCache] = None, image_cache_dir: Optional[Path] = None) -> None:
+        self.registry = TemplateRegistry(cache=cache)
+        self.image_cache_dir = image_cache_dir
+
+    def run_job(self, job: BatchJob) -> BatchResult:
+        started = time.perf_counter()
+        try:
+            outline_items = OutlineParser.parse(job.outline)
+            if not outline_items:
+                raise ValueError("No valid outline entries provided")
+            template = self.registry.checkout(job.template)
+            deck = render_deck(
+                template,
+                outline_items,
+                output_dir=job.output.parent,
+                title=job.title,
+                pages=job.pages,
+                enable_images=not job.skip_images,
+                output_name=job.output.name,
+                image_cache_dir=self.image_cache_dir,
+                job_id=job.job_id,
+            )
+        except Exception as exc:  # one bad job must not stop the batch
+            logger.exception("Job %s failed", job.job_id)
+            return BatchResult(
+                job_id=job.job_id,
+                status="error",
+                seconds=time.perf_counter() - started,
+                error=f"{type(exc).__name__}: {exc}",
+            )
+        return BatchResult(
+            job_id=job.job_id,
+            status="ok",
+            seconds=time.perf_counter() - started,
+            output=str(deck.output_path),
+            slides=deck.slide_count,
+            images=deck.image_count,
+        )
+
+    def run(self, jobs: Iterable[Union[BatchJob, BatchResult]], results: Optional[TextIO] = None) -> BatchReport:
+        report = BatchReport()
+        started = time.perf_counter()
+        for job in jobs:
+            result = job if isinstance(job, BatchResult) else self.run_job(job)
+            emit_result(report, result, results)
+        report.seconds = time.perf_counter() - started
+        logger.info(
+            "Rendered %d decks (%d failed, %d slides) in %.2fs: %.2f decks/s",
+            report.succeeded,
+            report.failed,
+            report.slides,
+            report.seconds,
+            report.decks_per_second,
+        )
+        return report
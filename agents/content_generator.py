@@ -1,87 +1,181 @@
 """Content expansion and asset generation."""
 from __future__ import annotations
 
-import textwrap
+from collections import deque
 from pathlib import Path
-from typing import List, Optional
-
-try:
-    from PIL import Image, ImageDraw, ImageFont
-except ImportError:  # pragma: no cover - optional dependency
-    Image = None  # type: ignore
+from typing import Deque, Dict, Iterable, Iterator, List, Optional, Tuple
 
+from agents.expansion import AsyncBatchExpander, expand_rule
+from agents.image_generator import Image, ImageHandle, ImageRenderer
 from config import settings
 from core.logging import get_logger
 from core.models import GeneratedSlide, OutlineItem, SlidePlan
+from core.profiling import get_profiler, timed
 
 logger = get_logger(__name__)
 
 
 class ContentGenerator:
-    def __init__(self, output_dir: Path, enable_images: bool = True) -> None:
+    def __init__(
+        self,
+        output_dir: Path,
+        enable_images: bool = True,
+        image_cache_dir: Optional[Path] = settings.IMAGE_CACHE_DIR,
+        image_workers: int = settings.IMAGE_WORKERS,
+        defer_images: bool = False,
+        images_in_memory: bool = False,
+        expander: Optional[AsyncBatchExpander] = None,
+    ) -> None:
         self.output_dir = output_dir
         self.enable_images = enable_images
         self.images_dir = self.output_dir / settings.IMAGES_DIR_NAME
-        if self.enable_images:
+        self.image_cache_dir = image_cache_dir
+        self.image_workers = image_workers
+        # Deferred mode hands out final image paths immediately and renders in the
+        # background; callers must call wait_for_images() before exiting.
+        self.defer_images = defer_images
+        # In-memory images never touch images_dir; their bytes end up in self.images by file name.
+        self.images_in_memory = images_in_memory
+        self.images: Dict[str, bytes] = {}
+        # None keeps the built-in rule; an expander batches bullets through its backend.
+        self.expander = expander
+        self._renderer: Optional[ImageRenderer] = None
+        self._pending: Deque[Tuple[GeneratedSlide, ImageHandle]] = deque()
+        self._image_failures = 0
+        self.images_written = 0
+        self.failed_images: List[GeneratedSlide] = []
+        if self.enable_images and not self.images_in_memory:
             self.images_dir.mkdir(parents=True, exist_ok=True)
 
+    @timed("content.generate", items=len)
     def generate(self, plans: List[SlidePlan]) -> List[GeneratedSlide]:
-        slides: List[GeneratedSlide] = []
+        renderer = self._get_renderer()
+        # Queue every image first so rendering overlaps with text expansion.
+        handles = [self._maybe_generate_image(renderer, plan.outline) for plan in plans]
+        if self.expander is None:
+            slides = [self._build_slide(plan, handle) for plan, handle in zip(plans, handles)]
+        else:
+            # One expansion pass for the whole deck so the backend sees full batches.
+            with get_profiler().stage("content.expand", items=len(plans)):
+                flat = self.expander.expand([bullet for plan in plans for bullet in plan.outline.bullets])
+            slides = []
+            offset = 0
+            for plan, handle in zip(plans, handles):
+                count = len(plan.outline.bullets)
+                slides.append(self._build_slide(plan, handle, flat[offset : offset + count]))
+                offset += count
+        if not self.defer_images:
+            self.wait_for_images()
+        return slides
+
+    def iter_generate(self, plans: Iterable[SlidePlan]) -> Iterator[Tuple[SlidePlan, GeneratedSlide]]:
+        """Expand plans one at a time; images always render in the background.
+
+        With an expander, plans are buffered until their bullets fill the
+        expander's window and expanded in one call, so the backend still sees
+        full batches. Callers must call wait_for_images() once the stream is exhausted.
+        """
+        renderer = self._get_renderer()
+        index = 0
+        window: List[Tuple[SlidePlan, Optional[ImageHandle]]] = []
+        window_bullets = 0
         for index, plan in enumerate(plans, start=1):
-            sentences = [self._expand_bullet(bullet) for bullet in plan.outline.bullets]
-            image_path = self._maybe_generate_image(index, plan.outline)
-            slides.append(
-                GeneratedSlide(
-                    title=plan.outline.title,
-                    bullet_sentences=sentences,
-                    outline=plan.outline,
-                    image_path=image_path,
-                )
+            handle = self._maybe_generate_image(renderer, plan.outline)
+            if self.expander is None:
+                yield plan, self._build_slide(plan, handle)
+            else:
+                window.append((plan, handle))
+                window_bullets += len(plan.outline.bullets)
+                if window_bullets >= self.expander.window:
+                    yield from self._expand_window(window)
+                    window, window_bullets = [], 0
+            # Drop finished images so only in-flight slides stay referenced.
+            while self._pending and self._pending[0][1].done():
+                self._settle(*self._pending.popleft())
+        if window:
+            yield from self._expand_window(window)
+        logger.debug("Streamed %d generated slides", index)
+
+    def _expand_window(
+        self, window: List[Tuple[SlidePlan, Optional[ImageHandle]]]
+    ) -> Iterator[Tuple[SlidePlan, GeneratedSlide]]:
+        with get_profiler().stage("content.expand", items=len(window)):
+            flat = self.expander.expand([bullet for plan, _ in window for bullet in plan.outline.bullets])
+        offset = 0
+        for plan, handle in window:
+            count = len(plan.outline.bullets)
+            yield plan, self._build_slide(plan, handle, flat[offset : offset + count])
+            offset += count
+
+    def wait_for_images(self) -> int:
+        """Block until queued images are written; returns how many have failed so far."""
+        if not self._pending and self._renderer is None:
+            # Already settled: nothing to wait for or to record again.
+            return self._image_failures
+        profiler = get_profiler()
+        with profiler.stage("content.images.wait"):
+            while self._pending:
+                self._settle(*self._pending.popleft())
+        if self._renderer is not None:
+            self._renderer.close()
+            self.images.update(self._renderer.images)
+            logger.info("Rendered %d images, reused %d", self._renderer.rendered, self._renderer.reused)
+            profiler.record(
+                "content.images.render",
+                wall_seconds=self._renderer.render_seconds,
+                items=self._renderer.rendered,
             )
-        return slides
+            self._renderer = None
+        return self._image_failures
+
+    def _build_slide(
+        self, plan: SlidePlan, handle: Optional[ImageHandle], sentences: Optional[List[str]] = None
+    ) -> GeneratedSlide:
+        if sentences is None:
+            with get_profiler().stage("content.text", items=1):
+                if self.expander is None:
+                    sentences = [self._expand_bullet(bullet) for bullet in plan.outline.bullets]
+                else:
+                    sentences = self.expander.expand(plan.outline.bullets)
+        slide = GeneratedSlide(
+            bullet_sentences=sentences,
+            outline=plan.outline,
+            image_path=handle.path if handle is not None else None,
+        )
+        if handle is not None:
+            self._pending.append((slide, handle))
+        return slide
+
+    def _settle(self, slide: GeneratedSlide, handle: ImageHandle) -> None:
+        try:
+            handle.result()
+        except Exception as exc:  # image failures keep the text and never block the deck
+            logger.warning("Image generation failed for '%s': %s", slide.title, exc)
+            slide.image_path = None
+            self._image_failures += 1
+            self.failed_images.append(slide)
+        else:
+            self.images_written += 1
 
     def _expand_bullet(self, bullet: str) -> str:
-        clean = bullet.strip()
-        if not clean:
-            return "待補充內容。"
-        if clean.endswith(settings.SENTENCE_ENDINGS):
-            return clean
-        if "：" in clean or ":" in clean:
-            return clean.rstrip("。") + "。"
-        return f"{clean}：聚焦此主題的關鍵重點。"
+        return expand_rule(bullet)
 
-    def _maybe_generate_image(self, index: int, outline: OutlineItem) -> Optional[Path]:
+    def _get_renderer(self) -> Optional[ImageRenderer]:
         if not self.enable_images:
             return None
-        hint = outline.image_hint or (outline.bullets[0] if outline.bullets else outline.title)
-        if not hint:
-            return None
         if Image is None:
             logger.debug("Pillow not installed; skipping image generation")
             return None
-        output_path = self.images_dir / f"slide_{index:02d}.png"
-        create_placeholder_image(
-            text=hint,
-            output_path=output_path,
-            title=outline.title,
-        )
-        return output_path
-
-
-def create_placeholder_image(text: str, output_path: Path, title: str) -> None:
-    image = Image.new("RGB", (settings.IMAGE_WIDTH, settings.IMAGE_HEIGHT), color=settings.BACKGROUND_COLOR)
-    draw = ImageDraw.Draw(image)
-    try:
-        font = ImageFont.truetype(settings.FONT_FALLBACK, 28)
-        subtitle_font = ImageFont.truetype(settings.FONT_FALLBACK, 20)
-    except OSError:
-        font = ImageFont.load_default()
-        subtitle_font = ImageFont.load_default()
-    wrapped_title = textwrap.fill(title, width=18)
-    wrapped_text = textwrap.fill(text, width=24)
-    draw.text((40, 40), wrapped_title, fill=settings.TEXT_COLOR, font=font)
-    draw.text((40, 120), wrapped_text, fill=settings.TEXT_COLOR, font=subtitle_font)
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    image.save(output_path)
-    logger.debug("Generated placeholder image at %s", output_path)
+        if self._renderer is None:
+            self._renderer = ImageRenderer(
+                cache_dir=self.image_cache_dir, workers=self.image_workers, in_memory=self.images_in_memory
+            )
+        return self._renderer
 
+    def _maybe_generate_image(self, renderer: Optional[ImageRenderer], outline: OutlineItem) -> Optional[ImageHandle]:
+        if renderer is None:
+            return None
+        hint = outline.image_hint or (outline.bullets[0] if outline.bullets else outline.title)
+        if not hint:
+            return None
+        return renderer.submit(text=hint, title=outline.title, images_dir=self.images_dir)
@@ -0,0 +1,148 @@
+"""Per-slide fingerprints that let a deck be regenerated incrementally."""
+from __future__ import annotations
+
+import hashlib
+import json
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Deque, Dict, List, Optional
+
+from config import settings
+from core.fileio import atomic_path
+from core.logging import get_logger
+from core.models import GeneratedSlide, OutlineItem, SlidePlan
+
+logger = get_logger(__name__)
+
+# Settings that change what a slide or its image looks like.
+_FINGERPRINT_SETTINGS = (
+    "COMMON_LAYOUT_ALIASES",
+    "FALLBACK_LAYOUT_KEY",
+    "TWO_CONTENT_MIN_BULLETS",
+    "PLACEHOLDER_ROLES",
+    "MAX_BULLETS_PER_SLIDE",
+    "SENTENCE_ENDINGS",
+    "TEXT_FIT",
+    "BODY_FONT_FILE",
+    "BODY_FONT_SIZE_PT",
+    "LINE_SPACING",
+    "IMAGE_WIDTH",
+    "IMAGE_HEIGHT",
+    "BACKGROUND_COLOR",
+    "TEXT_COLOR",
+    "FONT_FALLBACK",
+    "EMBED_IMAGE_DPI",
+)
+
+
+def manifest_path_for(output_path: Path) -> Path:
+    return output_path.with_name(output_path.stem + settings.DECK_MANIFEST_SUFFIX)
+
+
+def settings_fingerprint() -> str:
+    values = {name: getattr(settings, name) for name in _FINGERPRINT_SETTINGS}
+    return _digest(values)
+
+
+def slide_fingerprint(plan: SlidePlan, template_hash: str, settings_hash: str, enable_images: bool) -> str:
+    return _digest(
+        {
+            "outline": asdict(plan.outline),
+            "layout": [plan.layout.index, plan.layout.name],
+            "template": template_hash,
+            "settings": settings_hash,
+            "images": enable_images,
+        }
+    )
+
+
+def _digest(payload: Dict) -> str:
+    encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class SlideRecord:
+    fingerprint: str
+    slide: GeneratedSlide
+
+
+@dataclass
+class DeckManifest:
+    """What the previous run produced: template and output hashes plus one record per slide."""
+
+    VERSION = 1
+
+    template_hash: str
+    output_hash: str = ""
+    slides: List[SlideRecord] = field(default_factory=list)
+
+    @classmethod
+    def load(cls, path: Path) -> Optional["DeckManifest"]:
+        try:
+            payload = json.loads(path.read_text(encoding="utf-8"))
+            if payload.get("version") != cls.VERSION:
+                return None
+            return cls(
+                template_hash=payload["template_hash"],
+                output_hash=payload["output_hash"],
+                slides=[_record_from_dict(record) for record in payload["slides"]],
+            )
+        except FileNotFoundError:
+            return None
+        except (ValueError, KeyError, TypeError):
+            logger.warning("Ignoring unreadable deck manifest %s", path)
+            return None
+
+    def save(self, path: Path) -> None:
+        payload = {
+            "version": self.VERSION,
+            "template_hash": self.template_hash,
+            "output_hash": self.output_hash,
+            "slides": [_record_to_dict(record) for record in self.slides],
+        }
+        with atomic_path(path) as tmp_path:
+            tmp_path.write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
+
+    def match(self, fingerprints: List[str]) -> List[Optional[int]]:
+        """Map each new slide to an unchanged previous slide (0-based position) or None.
+
+        Slides may have moved; each previous slide is reused at most once, and only
+        while its image file still exists.
+        """
+        positions: Dict[str, Deque[int]] = {}
+        for position, record in enumerate(self.slides):
+            image_path = record.slide.image_path
+            if record.fingerprint and (image_path is None or image_path.exists()):
+                positions.setdefault(record.fingerprint, deque()).append(position)
+        matches: List[Optional[int]] = []
+        for fingerprint in fingerprints:
+            candidates = positions.get(fingerprint)
+            matches.append(candidates.popleft() if candidates else None)
+        return matches
+
+
+def _record_to_dict(record: SlideRecord) -> Dict:
+    slide = record.slide
+    return {
+        "fingerprint": record.fingerprint,
+        "title": slide.title,
+        "bullet_sentences": slide.bullet_sentences,
+        "outline": asdict(slide.outline),
+        "image_path": str(slide.image_path) if slide.image_path else None,
+        "notes": slide.notes,
+    }
+
+
+def _record_from_dict(payload: Dict) -> SlideRecord:
+    image_path = payload.get("image_path")
+    return SlideRecord(
+        fingerprint=payload["fingerprint"],
+        slide=GeneratedSlide(
+            bullet_sentences=list(payload["bullet_sentences"]),
+            outline=OutlineItem(**payload["outline"]),
+            image_path=Path(image_path) if image_path else None,
+            notes=dict(payload.get("notes") or {}),
+        ),
+    )
@@ -0,0 +1,318 @@
+"""Bullet expansion backends and an asyncio driver that batches and caches remote calls."""
+from __future__ import annotations
+
+import abc
+import asyncio
+import hashlib
+import json
+import random
+import sqlite3
+import threading
+import time
+import unicodedata
+import urllib.request
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from config import settings
+from core.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class ExpansionError(RuntimeError):
+    """A backend call failed or returned an unusable response."""
+
+
+def expand_rule(bullet: str) -> str:
+    """The built-in rule: turn a bullet into one short sentence."""
+    clean = bullet.strip()
+    if not clean:
+        return "待補充內容。"
+    if clean.endswith(settings.SENTENCE_ENDINGS):
+        return clean
+    if "：" in clean or ":" in clean:
+        return clean.rstrip("。") + "。"
+    return f"{clean}：聚焦此主題的關鍵重點。"
+
+
+def normalize_bullet(bullet: str) -> str:
+    return " ".join(unicodedata.normalize("NFKC", bullet).split())
+
+
+class ExpansionBackend(abc.ABC):
+    """Expands a batch of bullets into one sentence each, in order.
+
+    ``name`` identifies the backend in memo-cache and manifest keys, so results from
+    different backends never mix.
+    """
+
+    name = "base"
+
+    @abc.abstractmethod
+    async def expand_batch(self, bullets: List[str]) -> List[str]:
+        """Return one sentence per bullet, in order."""
+
+
+class RuleBackend(ExpansionBackend):
+    name = "rules"
+
+    async def expand_batch(self, bullets: List[str]) -> List[str]:
+        return [expand_rule(bullet) for bullet in bullets]
+
+
+class FakeRemoteBackend(ExpansionBackend):
+    """Offline stand-in for a remote model: rule output after a simulated round trip.
+
+    Each call sleeps ``latency`` plus ``per_item`` per bullet and fails with
+    probability ``failure_rate``. ``max_in_flight`` records the peak concurrency seen.
+    """
+
+    name = "fake"
+
+    def __init__(self, latency: float = 0.05, per_item: float = 0.001, failure_rate: float = 0.0, seed: int = 0) -> None:
+        self.latency = latency
+        self.per_item = per_item
+        self.failure_rate = failure_rate
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._random = random.Random(seed)
+
+    async def expand_batch(self, bullets: List[str]) -> List[str]:
+        self.calls += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.latency + self.per_item * len(bullets))
+            if self._random.random() < self.failure_rate:
+                raise ExpansionError("simulated backend failure")
+            return [expand_rule(bullet) for bullet in bullets]
+        finally:
+            self.in_flight -= 1
+
+
+class HttpBackend(ExpansionBackend):
+    """POSTs ``{"bullets": [...]}`` as JSON and expects ``{"sentences": [...]}`` back.
+
+    tools/expansion_stub_server.py implements the protocol for offline testing.
+    """
+
+    def __init__(self, url: str, timeout: float = settings.EXPANSION_TIMEOUT_SECONDS) -> None:
+        # Different services word the same bullets differently, so the URL is part of the identity.
+        self.name = f"http:{url}"
+        self.url = url
+        self.timeout = timeout
+
+    async def expand_batch(self, bullets: List[str]) -> List[str]:
+        return await asyncio.to_thread(self._post, bullets)
+
+    def _post(self, bullets: List[str]) -> List[str]:
+        body = json.dumps({"bullets": bullets}, ensure_ascii=False).encode("utf-8")
+        request = urllib.request.Request(self.url, data=body, headers={"Content-Type": "application/json"})
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                payload = json.loads(response.read().decode("utf-8"))
+        except (OSError, ValueError) as exc:
+            raise ExpansionError(f"{self.url}: {exc}") from exc
+        sentences = payload.get("sentences") if isinstance(payload, dict) else None
+        if not isinstance(sentences, list) or len(sentences) != len(bullets):
+            raise ExpansionError(f"{self.url}: expected {len(bullets)} sentences")
+        return [str(sentence) for sentence in sentences]
+
+
+class ExpansionMemo:
+    """On-disk memo of expansions in a SQLite file, safe to share between processes."""
+
+    def __init__(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._connection.execute("CREATE TABLE IF NOT EXISTS expansions (key TEXT PRIMARY KEY, sentence TEXT NOT NULL)")
+        self._connection.commit()
+
+    def get_many(self, keys: List[str]) -> Dict[str, str]:
+        found: Dict[str, str] = {}
+        with self._lock:
+            for start in range(0, len(keys), 500):
+                chunk = keys[start : start + 500]
+                marks = ",".join("?" * len(chunk))
+                rows = self._connection.execute(f"SELECT key, sentence FROM expansions WHERE key IN ({marks})", chunk)
+                found.update(rows.fetchall())
+        return found
+
+    def put_many(self, items: Dict[str, str]) -> None:
+        with self._lock:
+            self._connection.executemany("INSERT OR REPLACE INTO expansions VALUES (?, ?)", items.items())
+            self._connection.commit()
+
+    def close(self) -> None:
+        self._connection.close()
+
+
+class AsyncBatchExpander:
+    """Expands bullets through a backend with batching, bounded concurrency and caching.
+
+    Bullets are normalized (NFKC, collapsed whitespace) and de-duplicated, looked up
+    in an in-memory LRU and the optional on-disk memo, and the rest are sent in
+    batches of ``batch_size`` with at most ``max_in_flight`` calls running. Each call
+    times out after ``timeout`` seconds and is retried with exponential backoff; a
+    batch that still fails falls back to the built-in rule so the deck is never blocked.
+    """
+
+    def __init__(
+        self,
+        backend: ExpansionBackend,
+        batch_size: int = settings.EXPANSION_BATCH_SIZE,
+        max_in_flight: int = settings.EXPANSION_MAX_IN_FLIGHT,
+        retries: int = settings.EXPANSION_RETRIES,
+        backoff: float = settings.EXPANSION_BACKOFF_SECONDS,
+        timeout: float = settings.EXPANSION_TIMEOUT_SECONDS,
+        lru_size: int = settings.EXPANSION_LRU_SIZE,
+        memo: Optional[ExpansionMemo] = None,
+    ) -> None:
+        self.backend = backend
+        self.batch_size = max(1, batch_size)
+        self.max_in_flight = max(1, max_in_flight)
+        self.retries = max(0, retries)
+        self.backoff = backoff
+        self.timeout = timeout
+        self.lru_size = lru_size
+        self.memo = memo
+        self._lru: "OrderedDict[str, str]" = OrderedDict()
+        self.requests = 0
+        self.retried = 0
+        self.fallbacks = 0
+        self.lru_hits = 0
+        self.memo_hits = 0
+        self.call_seconds: List[float] = []
+
+    @property
+    def window(self) -> int:
+        """Bullets that fill every in-flight batch; streaming callers expand this many at once."""
+        return self.batch_size * self.max_in_flight
+
+    def expand(self, bullets: List[str]) -> List[str]:
+        """Synchronous entry point; async callers should await expand_async()."""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self.expand_async(bullets))
+        raise RuntimeError("AsyncBatchExpander.expand() cannot run inside an event loop; await expand_async()")
+
+    async def expand_async(self, bullets: List[str]) -> List[str]:
+        normalized = [normalize_bullet(bullet) for bullet in bullets]
+        results: Dict[str, str] = {"": expand_rule("")}
+        missing: List[str] = []
+        for text in dict.fromkeys(normalized):
+            if text in results:
+                continue
+            cached = self._lru_get(text)
+            if cached is not None:
+                results[text] = cached
+            else:
+                missing.append(text)
+        if missing and self.memo is not None:
+            stored = self.memo.get_many([self._memo_key(text) for text in missing])
+            still_missing = []
+            for text in missing:
+                sentence = stored.get(self._memo_key(text))
+                if sentence is None:
+                    still_missing.append(text)
+                else:
+                    self.memo_hits += 1
+                    results[text] = sentence
+                    self._lru_put(text, sentence)
+            missing = still_missing
+
+        if missing:
+            semaphore = asyncio.Semaphore(self.max_in_flight)
+            batches = [missing[i : i + self.batch_size] for i in range(0, len(missing), self.batch_size)]
+            outputs = await asyncio.gather(*(self._call(batch, semaphore) for batch in batches))
+            fresh: Dict[str, str] = {}
+            for batch, (sentences, from_backend) in zip(batches, outputs):
+                for text, sentence in zip(batch, sentences):
+                    results[text] = sentence
+                    if from_backend:
+                        fresh[text] = sentence
+                        self._lru_put(text, sentence)
+            if fresh and self.memo is not None:
+                self.memo.put_many({self._memo_key(text): sentence for text, sentence in fresh.items()})
+        return [results[text] for text in normalized]
+
+    def stats(self) -> Dict[str, float]:
+        latencies = sorted(self.call_seconds)
+
+        def percentile(fraction: float) -> float:
+            return latencies[min(len(latencies) - 1, int(fraction * len(latencies)))] if latencies else 0.0
+
+        return {
+            "requests": self.requests,
+            "retried": self.retried,
+            "fallbacks": self.fallbacks,
+            "lru_hits": self.lru_hits,
+            "memo_hits": self.memo_hits,
+            "p50_seconds": percentile(0.5),
+            "p95_seconds": percentile(0.95),
+        }
+
+    async def _call(self, batch: List[str], semaphore: asyncio.Semaphore):
+        """Returns (sentences, from_backend); rule fallbacks are not cached."""
+        async with semaphore:
+            for attempt in range(self.retries + 1):
+                if attempt:
+                    self.retried += 1
+                    await asyncio.sleep(self.backoff * 2 ** (attempt - 1))
+                self.requests += 1
+                started = time.perf_counter()
+                try:
+                    sentences = await asyncio.wait_for(self.backend.expand_batch(batch), self.timeout)
+                except Exception as exc:  # retried, then the rule fallback keeps the deck going
+                    logger.debug("Expansion call failed (attempt %d): %s", attempt + 1, exc)
+                    continue
+                finally:
+                    self.call_seconds.append(time.perf_counter() - started)
+                if len(sentences) == len(batch):
+                    return sentences, True
+                logger.debug("Expansion backend returned %d sentences for %d bullets", len(sentences), len(batch))
+        self.fallbacks += 1
+        logger.warning("Expansion backend failed %d times; using the rule for %d bullets", self.retries + 1, len(batch))
+        return [expand_rule(text) for text in batch], False
+
+    def _memo_key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.backend.name}\0{text}".encode("utf-8")).hexdigest()
+
+    def _lru_get(self, text: str) -> Optional[str]:
+        sentence = self._lru.get(text)
+        if sentence is not None:
+            self._lru.move_to_end(text)
+            self.lru_hits += 1
+        return sentence
+
+    def _lru_put(self, text: str, sentence: str) -> None:
+        if self.lru_size <= 0:
+            return
+        self._lru[text] = sentence
+        self._lru.move_to_end(text)
+        while len(self._lru) > self.lru_size:
+            self._lru.popitem(last=False)
+
+
+def build_expander(
+    backend: str, url: Optional[str] = None, memo_dir: Optional[Path] = settings.EXPANSION_CACHE_DIR
+) -> Optional[AsyncBatchExpander]:
+    """Return the expander for a backend name, or None for the default rule-based expansion."""
+    if backend == "rules":
+        return None
+    if backend == "fake":
+        chosen: ExpansionBackend = FakeRemoteBackend()
+    elif backend == "http":
+        if not url:
+            raise ValueError("The http expansion backend needs a URL")
+        chosen = HttpBackend(url)
+    else:
+        raise ValueError(f"Unknown expansion backend: {backend}")
+    memo = ExpansionMemo(memo_dir / "expansions.sqlite3") if memo_dir is not None else None
+    return AsyncBatchExpander(chosen, memo=memo)
@@ -0,0 +1,231 @@
+"""Placeholder image rendering with a worker pool and a content-addressed cache."""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from io import BytesIO
+from pathlib import Path
+from typing import BinaryIO, Dict, List, Optional, Union
+
+try:
+    from PIL import Image, ImageDraw, ImageFont
+except ImportError:  # pragma: no cover - optional dependency
+    Image = None  # type: ignore
+
+from agents.text_fitting import get_metrics
+from config import settings
+from core.fileio import atomic_copy, atomic_path
+from core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Bump when the drawing code changes so cached renders from older versions are not reused.
+RENDER_VERSION = 2
+TITLE_FONT_SIZE = 28
+TEXT_FONT_SIZE = 20
+IMAGE_MARGIN = 40
+TITLE_MAX_LINES = 3
+
+_fonts = threading.local()
+# Worker pools by size, shared by every renderer in the process so their threads,
+# and the fonts each thread has loaded, outlive a single deck.
+_executors: Dict[int, ThreadPoolExecutor] = {}
+_executors_lock = threading.Lock()
+# A forked child inherits the pools but not their threads.
+os.register_at_fork(after_in_child=_executors.clear)
+
+
+def load_font(size: int):
+    # FreeType faces are not safe to share between threads, so each worker keeps its own.
+    cache = getattr(_fonts, "by_size", None)
+    if cache is None:
+        cache = _fonts.by_size = {}
+    font = cache.get(size)
+    if font is None:
+        try:
+            font = ImageFont.truetype(settings.FONT_FALLBACK, size)
+        except OSError:
+            font = ImageFont.load_default()
+        cache[size] = font
+    return font
+
+
+def _shared_executor(workers: int) -> ThreadPoolExecutor:
+    with _executors_lock:
+        executor = _executors.get(workers)
+        if executor is None:
+            executor = _executors[workers] = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="image")
+        return executor
+
+
+def image_key(text: str, title: str) -> str:
+    payload = [
+        RENDER_VERSION,
+        title,
+        text,
+        settings.IMAGE_WIDTH,
+        settings.IMAGE_HEIGHT,
+        list(settings.BACKGROUND_COLOR),
+        list(settings.TEXT_COLOR),
+        settings.FONT_FALLBACK,
+        TITLE_FONT_SIZE,
+        TEXT_FONT_SIZE,
+        TITLE_MAX_LINES,
+        settings.LINE_SPACING,
+    ]
+    encoded = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def create_placeholder_image(text: str, output_path: Union[Path, BinaryIO], title: str) -> None:
+    """Draw the placeholder PNG to a file path or a binary stream."""
+    image = Image.new("RGB", (settings.IMAGE_WIDTH, settings.IMAGE_HEIGHT), color=settings.BACKGROUND_COLOR)
+    draw = ImageDraw.Draw(image)
+    font = load_font(TITLE_FONT_SIZE)
+    subtitle_font = load_font(TEXT_FONT_SIZE)
+    # Wrap by measured width so CJK and proportional Latin text both fill the line.
+    metrics = get_metrics(settings.FONT_FALLBACK)
+    max_width = settings.IMAGE_WIDTH - 2 * IMAGE_MARGIN
+    title_lines = metrics.wrap(title, TITLE_FONT_SIZE, max_width)
+    if len(title_lines) > TITLE_MAX_LINES:
+        title_lines = title_lines[:TITLE_MAX_LINES]
+        title_lines[-1] += "…"
+    text_lines = metrics.wrap(text, TEXT_FONT_SIZE, max_width)
+    text_top = max(120, IMAGE_MARGIN + len(title_lines) * round(TITLE_FONT_SIZE * settings.LINE_SPACING) + 16)
+    draw.text((IMAGE_MARGIN, IMAGE_MARGIN), "\n".join(title_lines), fill=settings.TEXT_COLOR, font=font)
+    draw.text((IMAGE_MARGIN, text_top), "\n".join(text_lines), fill=settings.TEXT_COLOR, font=subtitle_font)
+    if isinstance(output_path, Path):
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+    image.save(output_path, format="PNG")
+    logger.debug("Generated placeholder image at %s", output_path)
+
+
+@dataclass
+class ImageHandle:
+    """A queued image whose final path is known before the PNG exists."""
+
+    path: Path
+    future: Future
+
+    def done(self) -> bool:
+        return self.future.done()
+
+    def result(self, timeout: Optional[float] = None) -> Path:
+        return self.future.result(timeout=timeout)
+
+
+class ImageRenderer:
+    """Renders placeholder images on a thread pool, never drawing the same image twice.
+
+    Images are content-addressed: each lands in the requested directory as
+    ``<image_key>.png``, so identical slides, and concurrent jobs sharing a directory,
+    share one file. With a cache directory renders also persist across output
+    directories and runs. In memory mode nothing touches the disk: handles still
+    carry the ``<image_key>.png`` path and the PNG bytes are kept in ``images``.
+    """
+
+    def __init__(
+        self, cache_dir: Optional[Path] = None, workers: int = settings.IMAGE_WORKERS, in_memory: bool = False
+    ) -> None:
+        self.cache_dir = None if in_memory else cache_dir
+        self.in_memory = in_memory
+        # file name -> PNG bytes, filled in memory mode only
+        self.images: Dict[str, bytes] = {}
+        self.rendered = 0
+        self.reused = 0
+        # Summed time spent drawing and encoding across worker threads.
+        self.render_seconds = 0.0
+        self._lock = threading.Lock()
+        self._sources: Dict[str, Future] = {}
+        self._handles: List[Future] = []
+        self._executor = _shared_executor(max(1, workers))
+        if self.cache_dir is not None:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def submit(self, text: str, title: str, images_dir: Path) -> ImageHandle:
+        key = image_key(text, title)
+        output_path = images_dir / f"{key}.png"
+        with self._lock:
+            source = self._sources.get(key)
+            if source is None:
+                if self.in_memory:
+                    source = self._executor.submit(self._render_to_memory, text, title, output_path.name)
+                else:
+                    target = self.cache_dir / f"{key}.png" if self.cache_dir is not None else output_path
+                    source = self._executor.submit(self._render, text, title, target)
+                self._sources[key] = source
+            else:
+                self.reused += 1
+        result: Future = Future()
+
+        def _materialize(done: Future) -> None:
+            try:
+                source_path = done.result()
+                if source_path is not None:
+                    _place(source_path, output_path)
+            except BaseException as exc:  # surfaced to whoever waits on the slide image
+                result.set_exception(exc)
+            else:
+                result.set_result(output_path)
+
+        source.add_done_callback(_materialize)
+        self._handles.append(result)
+        return ImageHandle(path=output_path, future=result)
+
+    def close(self) -> None:
+        """Wait for this renderer's images; the shared worker threads keep running."""
+        wait(self._handles)
+        self._handles = []
+
+    def _render(self, text: str, title: str, target: Path) -> Path:
+        if target.exists():
+            with self._lock:
+                self.reused += 1
+            return target
+        started = time.perf_counter()
+        with atomic_path(target) as tmp_path:
+            create_placeholder_image(text=text, output_path=tmp_path, title=title)
+        with self._lock:
+            self.rendered += 1
+            self.render_seconds += time.perf_counter() - started
+        return target
+
+    def _render_to_memory(self, text: str, title: str, name: str) -> None:
+        started = time.perf_counter()
+        buffer = BytesIO()
+        create_placeholder_image(text=text, output_path=buffer, title=title)
+        with self._lock:
+            self.images[name] = buffer.getvalue()
+            self.rendered += 1
+            self.render_seconds += time.perf_counter() - started
+
+
+def fit_image(blob: bytes, width: int, height: int) -> bytes:
+    """Downscale an image to just cover ``width`` x ``height`` pixels, re-encoded as PNG.
+
+    Images that are already small enough, or that would not get smaller, come back unchanged.
+    """
+    if Image is None:
+        return blob
+    with Image.open(BytesIO(blob)) as image:
+        scale = max(width / image.width, height / image.height)
+        if scale >= 1:
+            return blob
+        size = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+        buffer = BytesIO()
+        image.resize(size, Image.LANCZOS).save(buffer, format="PNG", optimize=True)
+    fitted = buffer.getvalue()
+    return fitted if len(fitted) < len(blob) else blob
+
+
+def _place(source: Path, destination: Path) -> None:
+    # Same key, same bytes: an existing file is already the right image. Copy rather
+    # than hard-link so edits to a deck's images never leak into the cache.
+    if source == destination or destination.exists():
+        return
+    atomic_copy(source, destination)
@@ -1,11 +1,12 @@
 """Layout selection heuristics."""
 from __future__ import annotations
 
-from typing import List
+from typing import Dict, Iterable, Iterator, List, Optional
 
 from config import settings
 from core.logging import get_logger
-from core.models import OutlineSummary, SlidePlan, TemplateLayout, TemplateSummary
+from core.models import OutlineItem, OutlineSummary, SlidePlan, TemplateLayout, TemplateSummary
+from core.profiling import timed
 
 logger = get_logger(__name__)
 
@@ -14,24 +15,56 @@ class LayoutMatcher:
     def __init__(self, template_summary: TemplateSummary) -> None:
         self.template_summary = template_summary
         self.layouts = template_summary.layouts
+        # Index the template once; per-slide selection is then a constant-time lookup.
+        self._by_kind: Dict[str, List[TemplateLayout]] = {}
+        self._by_name: Dict[str, TemplateLayout] = {}
+        for layout in self.layouts:
+            self._by_kind.setdefault(layout.kind, []).append(layout)
+            self._by_name.setdefault(layout.name.lower(), layout)
+        self._title_layout = self._find_by_kind("title")
+        self._two_content_layout = self._find_by_kind("content_two")
+        self._body_layout = self._resolve_body_layout() if self.layouts else None
 
+    @timed("layout.match", items=len)
     def match(self, outline: OutlineSummary) -> List[SlidePlan]:
-        plans: List[SlidePlan] = []
-        for idx, item in enumerate(outline.items):
-            layout = self._select_layout(idx)
-            plans.append(SlidePlan(layout=layout, outline=item))
-        logger.info("Matched %d slides to layouts", len(plans))
-        return plans
-
-    def _select_layout(self, slide_index: int) -> TemplateLayout:
-        if slide_index == 0:
-            layout = self._find_by_kind("title")
-            if layout:
-                return layout
-        layout = self._find_by_kind("content")
-        if layout:
-            return layout
-        layout = self._find_by_kind("content_two")
+        return list(self.iter_match(outline.items))
+
+    def iter_match(self, items: Iterable[OutlineItem]) -> Iterator[SlidePlan]:
+        count = 0
+        for idx, item in enumerate(items):
+            yield SlidePlan(layout=self._select_layout(idx, item), outline=item)
+            count += 1
+        logger.info("Matched %d slides to layouts", count)
+
+    def layouts_for_kind(self, kind: str) -> List[TemplateLayout]:
+        return list(self._by_kind.get(kind, ()))
+
+    @property
+    def body_layout(self) -> Optional[TemplateLayout]:
+        """The layout used for ordinary content slides."""
+        return self._body_layout
+
+    def selectable_layouts(self) -> List[TemplateLayout]:
+        """Every layout _select_layout() can return, in template order."""
+        candidates = (self._title_layout, self._two_content_layout, self._body_layout)
+        chosen = {layout.index: layout for layout in candidates if layout is not None}
+        return [chosen[index] for index in sorted(chosen)]
+
+    def _select_layout(self, slide_index: int, item: Optional[OutlineItem] = None) -> TemplateLayout:
+        if slide_index == 0 and self._title_layout is not None:
+            return self._title_layout
+        if (
+            item is not None
+            and self._two_content_layout is not None
+            and 0 < settings.TWO_CONTENT_MIN_BULLETS <= len(item.bullets)
+        ):
+            return self._two_content_layout
+        if self._body_layout is None:
+            return self.layouts[0]
+        return self._body_layout
+
+    def _resolve_body_layout(self) -> TemplateLayout:
+        layout = self._find_by_kind("content") or self._find_by_kind("content_two")
         if layout:
             return layout
         fallback = self._find_by_name(settings.FALLBACK_LAYOUT_KEY)
@@ -41,15 +74,8 @@ class LayoutMatcher:
         return self.layouts[0]
 
     def _find_by_kind(self, kind: str) -> TemplateLayout | None:
-        for layout in self.layouts:
-            if layout.kind == kind:
-                return layout
-        return None
+        layouts = self._by_kind.get(kind)
+        return layouts[0] if layouts else None
 
     def _find_by_name(self, name: str) -> TemplateLayout | None:
-        name = name.lower()
-        for layout in self.layouts:
-            if layout.name.lower() == name:
-                return layout
-        return None
-
+        return self._by_name.get(name.lower())
@@ -1,63 +1,114 @@
 """Outline processing and pagination logic."""
 from __future__ import annotations
 
-from typing import Iterable, List, Tuple
+import heapq
+import json
+import re
+from typing import TYPE_CHECKING, Iterable, Iterator, List, Optional, Tuple
 
+from agents.expansion import expand_rule
 from config import settings
 from core.logging import get_logger
 from core.models import OutlineItem, OutlineSummary
+from core.profiling import timed
+
+if TYPE_CHECKING:
+    from agents.text_fitting import TextFitter
 
 logger = get_logger(__name__)
 
+_JSON_ENTRY = re.compile(r'\{\s*"')
+
 
 class OutlineParser:
+    """Parses outline entries in the CLI `Title|b1,b2|image:x` format or as JSON objects.
+
+    JSON entries look like {"title": ..., "bullets": [...], "image": ...} and are
+    recognised by a leading '{"', so files may mix both formats line by line and
+    titles such as "{Roadmap} 2027" still use the line format.
+    """
+
     @staticmethod
     def parse(raw_entries: Iterable[str]) -> List[OutlineItem]:
-        items: List[OutlineItem] = []
+        return list(OutlineParser.iter_parse(raw_entries))
+
+    @staticmethod
+    def iter_parse(raw_entries: Iterable[str]) -> Iterator[OutlineItem]:
         for raw in raw_entries:
-            raw = raw.strip()
-            raw = raw.strip("\"")
-            raw = raw.strip("'")  # tolerate quoting artifacts
-            if not raw:
-                continue
-            parts = [part.strip() for part in raw.split("|") if part.strip()]
-            if not parts:
-                continue
-            title = parts[0]
-            bullets: List[str] = []
-            image_hint = None
-            for section in parts[1:]:
-                if section.lower().startswith("image:"):
-                    image_hint = section.split(":", 1)[1].strip() or None
-                else:
-                    bullets.extend([b.strip() for b in section.split(",") if b.strip()])
-            if not bullets:
-                bullets = ["請填寫內容"]
-            items.append(OutlineItem(title=title, bullets=bullets, image_hint=image_hint))
-        return items
+            item = OutlineParser.parse_entry(raw)
+            if item is not None:
+                yield item
+
+    @staticmethod
+    def parse_entry(raw: str) -> Optional[OutlineItem]:
+        raw = raw.strip()
+        if _JSON_ENTRY.match(raw):
+            return OutlineParser._parse_json(raw)
+        raw = raw.strip("\"")
+        raw = raw.strip("'")  # tolerate quoting artifacts
+        if not raw:
+            return None
+        parts = [part.strip() for part in raw.split("|") if part.strip()]
+        if not parts:
+            return None
+        title = parts[0]
+        bullets: List[str] = []
+        image_hint = None
+        for section in parts[1:]:
+            if section.lower().startswith("image:"):
+                image_hint = section.split(":", 1)[1].strip() or None
+            else:
+                bullets.extend([b.strip() for b in section.split(",") if b.strip()])
+        if not bullets:
+            bullets = ["請填寫內容"]
+        return OutlineItem(title=title, bullets=bullets, image_hint=image_hint)
+
+    @staticmethod
+    def _parse_json(raw: str) -> Optional[OutlineItem]:
+        try:
+            payload = json.loads(raw)
+        except ValueError as exc:
+            logger.warning("Skipping invalid JSON outline entry: %s", exc)
+            return None
+        title = str(payload.get("title") or "").strip() if isinstance(payload, dict) else ""
+        if not title:
+            logger.warning("Skipping JSON outline entry without a title")
+            return None
+        raw_bullets = payload.get("bullets") or []
+        if isinstance(raw_bullets, str):
+            raw_bullets = raw_bullets.split(",")
+        bullets = [str(b).strip() for b in raw_bullets if str(b).strip()] or ["請填寫內容"]
+        image = payload.get("image") or payload.get("image_hint")
+        image_hint = (str(image).strip() or None) if image else None
+        return OutlineItem(title=title, bullets=bullets, image_hint=image_hint)
 
 
 class OutlineManager:
-    def __init__(self, target_pages: int) -> None:
+    def __init__(self, target_pages: Optional[int], fitter: Optional["TextFitter"] = None) -> None:
+        # None targets the number of incoming outline items, which is only known
+        # once a streamed outline has been consumed.
         self.target_pages = target_pages
+        # With a fitter, slides are also split where their bullets would overflow the body.
+        self.fitter = fitter
 
-    def organize(self, items: List[OutlineItem]) -> OutlineSummary:
-        logger.info("Organizing outline into %d pages", self.target_pages)
-        normalized = self._split_long_bullets(items)
-        adjusted = self._meet_page_target(normalized)
+    @timed("outline.organize", items=lambda summary: len(summary.items))
+    def organize(self, items: Iterable[OutlineItem]) -> OutlineSummary:
+        normalized, source_count = self._split_long_bullets(items)
+        target_pages = source_count if self.target_pages is None else self.target_pages
+        logger.info("Organizing outline into %d pages", target_pages)
+        adjusted = self._meet_page_target(normalized, target_pages)
         return OutlineSummary(items=adjusted)
 
-    def _split_long_bullets(self, items: List[OutlineItem]) -> List[OutlineItem]:
+    def _split_long_bullets(self, items: Iterable[OutlineItem]) -> Tuple[List[OutlineItem], int]:
         result: List[OutlineItem] = []
+        source_count = 0
         for item in items:
+            source_count += 1
             bullets = item.bullets
-            if len(bullets) <= settings.MAX_BULLETS_PER_SLIDE:
+            chunks = self._chunk_bullets(bullets)
+            if len(chunks) == 1:
                 result.append(item)
                 continue
-            chunks = [
-                bullets[i : i + settings.MAX_BULLETS_PER_SLIDE]
-                for i in range(0, len(bullets), settings.MAX_BULLETS_PER_SLIDE)
-            ]
             total = len(chunks)
             for index, chunk in enumerate(chunks, start=1):
                 suffix = f" (Part {index}/{total})"
@@ -68,52 +119,104 @@ class OutlineManager:
                         image_hint=item.image_hint,
                     )
                 )
-        return result
+        return result, source_count
+
+    def _chunk_bullets(self, bullets: List[str]) -> List[List[str]]:
+        if self.fitter is None:
+            if len(bullets) <= settings.MAX_BULLETS_PER_SLIDE:
+                return [bullets]
+            return [
+                bullets[i : i + settings.MAX_BULLETS_PER_SLIDE]
+                for i in range(0, len(bullets), settings.MAX_BULLETS_PER_SLIDE)
+            ]
+        # Measure what the slide will show: the rule-expanded sentence of each bullet.
+        sentences = [expand_rule(bullet) for bullet in bullets]
+        chunks = []
+        start = 0
+        for size in self.fitter.chunk_sizes(sentences, settings.MAX_BULLETS_PER_SLIDE):
+            chunks.append(bullets[start : start + size])
+            start += size
+        return chunks or [bullets]
 
-    def _meet_page_target(self, items: List[OutlineItem]) -> List[OutlineItem]:
-        if self.target_pages <= 0:
+    def _fits(self, bullets: List[str]) -> bool:
+        """Whether bullets fit one slide; without a fitter any merge is allowed."""
+        if self.fitter is None:
+            return True
+        return self.fitter.fits([expand_rule(bullet) for bullet in bullets], settings.MAX_BULLETS_PER_SLIDE)
+
+    def _meet_page_target(self, items: List[OutlineItem], target_pages: int) -> List[OutlineItem]:
+        if target_pages <= 0:
             return items
         items = list(items)
-        while len(items) > self.target_pages and len(items) > 1:
-            merge_index = self._find_merge_index(items)
-            first = items.pop(merge_index)
-            second = items.pop(merge_index)
-            merged_title = f"{first.title} / {second.title}"
-            merged_bullets = first.bullets + second.bullets
-            merged_hint = first.image_hint or second.image_hint
-            items.insert(
-                merge_index,
-                OutlineItem(title=merged_title, bullets=merged_bullets, image_hint=merged_hint),
+        if len(items) > target_pages:
+            return self._merge_to_target(items, target_pages)
+        if len(items) < target_pages:
+            return self._split_to_target(items, target_pages)
+        return items
+
+    def _merge_to_target(self, items: List[OutlineItem], target_pages: int) -> List[OutlineItem]:
+        # Repeatedly merge the adjacent pair with the fewest bullets (leftmost on ties).
+        # Pairs live in a heap with lazy invalidation over a linked list of slots;
+        # a merged item reuses its left slot so slot ids stay in list order.
+        slots: List[OutlineItem | None] = list(items)
+        counts = [len(item.bullets) for item in items]
+        next_slot = list(range(1, len(items))) + [-1]
+        prev_slot = list(range(-1, len(items) - 1))
+        heap = [(counts[idx] + counts[idx + 1], idx, idx + 1) for idx in range(len(items) - 1)]
+        heapq.heapify(heap)
+        remaining = len(items)
+        while remaining > target_pages and remaining > 1 and heap:
+            total, left, right = heapq.heappop(heap)
+            stale = slots[left] is None or slots[right] is None or next_slot[left] != right
+            if stale or counts[left] + counts[right] != total:
+                continue
+            first, second = slots[left], slots[right]
+            if not self._fits(first.bullets + second.bullets):
+                # This pair only changes through a merge, which pushes a fresh entry.
+                continue
+            slots[left] = OutlineItem(
+                title=f"{first.title} / {second.title}",
+                bullets=first.bullets + second.bullets,
+                image_hint=first.image_hint or second.image_hint,
             )
+            slots[right] = None
+            counts[left] = total
+            following = next_slot[right]
+            next_slot[left] = following
+            if following != -1:
+                prev_slot[following] = left
+                heapq.heappush(heap, (total + counts[following], left, following))
+            preceding = prev_slot[left]
+            if preceding != -1:
+                heapq.heappush(heap, (counts[preceding] + total, preceding, left))
+            remaining -= 1
+        if remaining > target_pages:
+            logger.info("Kept %d pages; merging further would overflow the body", remaining)
+        result: List[OutlineItem] = []
+        slot = 0
+        while slot != -1:
+            result.append(slots[slot])
+            slot = next_slot[slot]
+        return result
+
+    def _split_to_target(self, items: List[OutlineItem], target_pages: int) -> List[OutlineItem]:
+        # Repeatedly split the item with the most bullets (leftmost on ties). Tuple
+        # keys order items by position: the halves of key k become k+(0,) and k+(1,).
+        alive = {(idx,): item for idx, item in enumerate(items)}
+        heap = [(-len(item.bullets), key) for key, item in alive.items()]
+        heapq.heapify(heap)
         split_round = 1
-        while len(items) < self.target_pages and items:
-            idx = self._find_split_index(items)
-            outline = items.pop(idx)
-            first, second = self._split_outline(outline)
-            items.insert(idx, second)
-            items.insert(idx, first)
+        while len(alive) < target_pages and alive:
+            _, key = heapq.heappop(heap)
+            first, second = self._split_outline(alive.pop(key))
+            for child_key, child in ((key + (0,), first), (key + (1,), second)):
+                alive[child_key] = child
+                heapq.heappush(heap, (-len(child.bullets), child_key))
             split_round += 1
-            if split_round > self.target_pages * 2:
+            if split_round > target_pages * 2:
                 logger.warning("Unable to reach target pages cleanly; returning current items")
                 break
-        return items
-
-    def _find_merge_index(self, items: List[OutlineItem]) -> int:
-        min_total = float("inf")
-        min_index = 0
-        for idx in range(len(items) - 1):
-            total = len(items[idx].bullets) + len(items[idx + 1].bullets)
-            if total < min_total:
-                min_total = total
-                min_index = idx
-        return min_index
-
-    def _find_split_index(self, items: List[OutlineItem]) -> int:
-        max_bullets = max(len(item.bullets) for item in items)
-        for idx, item in enumerate(items):
-            if len(item.bullets) == max_bullets:
-                return idx
-        return 0
+        return [alive[key] for key in sorted(alive)]
 
     def _split_outline(self, item: OutlineItem) -> Tuple[OutlineItem, OutlineItem]:
         if len(item.bullets) <= 1:
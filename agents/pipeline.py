@@ -0,0 +1,317 @@
+"""End-to-end deck rendering shared by the CLI and batch entry points."""
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+import uuid
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional
+
+from agents.content_generator import ContentGenerator
+from agents.deck_manifest import DeckManifest, SlideRecord, manifest_path_for, settings_fingerprint, slide_fingerprint
+from agents.expansion import AsyncBatchExpander
+from agents.layout_matcher import LayoutMatcher
+from agents.outline_manager import OutlineManager
+from agents.slide_generator import SlideGenerator
+from agents.template_cache import hash_template
+from agents.template_loader import LoadedTemplate, load_deck
+from agents.text_fitting import fitter_for_layout
+from config import settings
+from core.logging import get_logger
+from core.models import GeneratedSlide, OutlineItem, SlidePlan
+from core.profiling import StageMemory
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class DeckResult:
+    # None when the deck was written to a stream
+    output_path: Optional[Path]
+    slide_count: int
+    image_count: int
+    images_dir: Optional[Path] = None
+    reused_slides: int = 0
+    # PNG bytes by file name when images were kept in memory
+    images: Dict[str, bytes] = field(default_factory=dict)
+
+
+@dataclass
+class DeckRequest:
+    """One deck of a render_decks() run."""
+
+    outline_items: List[OutlineItem]
+    output_name: str = settings.PRESENTATION_NAME
+    title: Optional[str] = None
+    pages: int = 0
+    job_id: Optional[str] = None
+    output: Optional[BinaryIO] = None
+
+
+def render_deck(
+    template: LoadedTemplate,
+    outline_items: Iterable[OutlineItem],
+    output_dir: Path,
+    title: Optional[str] = None,
+    pages: int = 0,
+    enable_images: bool = True,
+    output_name: str = settings.PRESENTATION_NAME,
+    image_cache_dir: Optional[Path] = settings.IMAGE_CACHE_DIR,
+    defer_images: bool = False,
+    stream: bool = False,
+    memory: Optional[StageMemory] = None,
+    incremental: bool = False,
+    job_id: Optional[str] = None,
+    output: Optional[BinaryIO] = None,
+    images_in_memory: bool = False,
+    expander: Optional[AsyncBatchExpander] = None,
+    embed_images: bool = settings.EMBED_IMAGES,
+) -> DeckResult:
+    """Render one deck.
+
+    With ``stream`` the layout, content and slide stages run item by item as
+    generators; only the page-target step buffers the outline. ``memory``
+    records the peak traced memory of each stage. ``incremental`` reuses the
+    slides of the previous deck in ``output_dir`` whose inputs are unchanged
+    and takes precedence over ``stream``. ``output_name`` may use the fields
+    of format_output_name().
+
+    With ``output`` the deck is written to that binary stream instead of
+    ``output_dir``; together with ``images_in_memory`` nothing is written to
+    disk and the images are returned in ``DeckResult.images``. ``expander``
+    replaces the built-in bullet rule with a batched backend. ``embed_images``
+    places the images into the layouts' picture placeholders before saving.
+    """
+    if incremental and (output is not None or images_in_memory):
+        raise ValueError("Incremental rendering needs the deck and images on disk")
+    memory = memory or StageMemory(enabled=False)
+    matcher = LayoutMatcher(template.summary)
+    fitter = fitter_for_layout(template, matcher.body_layout) if settings.TEXT_FIT and matcher.body_layout else None
+    with memory.measure("outline"):
+        manager = OutlineManager(target_pages=pages if pages > 0 else None, fitter=fitter)
+        outline_summary = manager.organize(outline_items)
+    output_name = format_output_name(output_name, template, outline_summary.items, title=title, job_id=job_id)
+
+    if output is None:
+        output_dir.mkdir(parents=True, exist_ok=True)
+    content_generator = ContentGenerator(
+        output_dir=output_dir,
+        enable_images=enable_images,
+        image_cache_dir=image_cache_dir,
+        defer_images=defer_images,
+        images_in_memory=images_in_memory,
+        expander=expander,
+    )
+    if incremental:
+        with memory.measure("layout"):
+            plans = matcher.match(outline_summary)
+        return _render_incremental(
+            template, plans, content_generator, output_dir, output_name, title, enable_images, embed_images
+        )
+    slide_generator = SlideGenerator(
+        template=template, output_dir=output_dir, output_name=output_name, embed_images=embed_images
+    )
+    if title:
+        slide_generator.presentation.core_properties.title = title
+    try:
+        if stream:
+            plans = memory.iter("layout", matcher.iter_match(outline_summary.items))
+            slides = memory.iter("content", content_generator.iter_generate(plans))
+            with memory.measure("slides"):
+                slide_count = slide_generator.add_slides(slides)
+        else:
+            with memory.measure("layout"):
+                plans = matcher.match(outline_summary)
+            with memory.measure("content"):
+                generated_slides = content_generator.generate(plans)
+            with memory.measure("slides"):
+                slide_count = slide_generator.add_slides(zip(plans, generated_slides))
+        # Deferred and streamed images render while the deck is built; settle them before saving
+        # so failed images neither appear in the notes nor get embedded.
+        content_generator.wait_for_images()
+        slide_generator.drop_image_notes(content_generator.failed_images)
+        if embed_images:
+            slide_generator.insert_pictures(content_generator.images)
+        with memory.measure("save"):
+            output_path = slide_generator.save(output)
+    finally:
+        failures = content_generator.wait_for_images()
+    if failures:
+        logger.warning("%d images failed; their slides keep text only", failures)
+    image_count = content_generator.images_written
+    return DeckResult(
+        output_path=output_path,
+        slide_count=slide_count,
+        image_count=image_count,
+        images_dir=content_generator.images_dir if image_count and not images_in_memory else None,
+        images=content_generator.images,
+    )
+
+
+def render_decks(
+    template: LoadedTemplate,
+    requests: Iterable[DeckRequest],
+    output_dir: Path,
+    enable_images: bool = True,
+    image_cache_dir: Optional[Path] = settings.IMAGE_CACHE_DIR,
+    images_in_memory: bool = False,
+    expander: Optional[AsyncBatchExpander] = None,
+    embed_images: bool = settings.EMBED_IMAGES,
+) -> Iterator[DeckResult]:
+    """Render many decks from one loaded template, yielding a result per request.
+
+    The template is parsed once: each deck is built on ``template.presentation`` and
+    its slides are removed again before the next one, so per-deck cost is slide
+    insertion plus save. Decks sharing ``output_dir`` need distinct output names.
+    """
+    baseline = _TemplateBaseline(template.presentation)
+    for request in requests:
+        try:
+            result = render_deck(
+                template,
+                request.outline_items,
+                output_dir=output_dir,
+                title=request.title,
+                pages=request.pages,
+                enable_images=enable_images,
+                output_name=request.output_name,
+                image_cache_dir=image_cache_dir,
+                job_id=request.job_id,
+                output=request.output,
+                images_in_memory=images_in_memory,
+                expander=expander,
+                embed_images=embed_images,
+            )
+        finally:
+            baseline.restore()
+        yield result
+
+
+class _TemplateBaseline:
+    """The slides and title of a template before any deck was built on it."""
+
+    def __init__(self, presentation) -> None:
+        self.presentation = presentation
+        self.slide_count = len(presentation.slides._sldIdLst)
+        self.title = presentation.core_properties.title
+
+    def restore(self) -> None:
+        id_list = self.presentation.slides._sldIdLst
+        # Dropping the relationship orphans the slide and notes parts, so they are not saved.
+        for entry in list(id_list)[self.slide_count :]:
+            id_list.remove(entry)
+            self.presentation.part.drop_rel(entry.rId)
+        self.presentation.core_properties.title = self.title
+
+
+def format_output_name(
+    pattern: str,
+    template: LoadedTemplate,
+    items: List[OutlineItem],
+    title: Optional[str] = None,
+    job_id: Optional[str] = None,
+) -> str:
+    """Expand ``{title}``, ``{hash}`` and ``{job}`` in an output file name.
+
+    ``{title}`` is a filesystem-safe slug of the deck title, ``{hash}`` a short digest
+    of the template path, title and organized outline, and ``{job}`` the job id or a
+    random one, so concurrent jobs can share an output directory.
+    """
+    if "{" not in pattern:
+        return pattern
+    fields = {"title": _slug(title) if title else "deck", "hash": "", "job": job_id or uuid.uuid4().hex[:12]}
+    if "{hash}" in pattern:
+        payload = json.dumps(
+            [str(template.path), title, [asdict(item) for item in items]], ensure_ascii=False, sort_keys=True
+        )
+        fields["hash"] = hashlib.sha256(payload.encode("utf-8")).hexdigest()[:12]
+    try:
+        return pattern.format(**fields)
+    except (KeyError, IndexError, ValueError) as exc:
+        raise ValueError(f"Invalid output name pattern {pattern!r}: {exc}") from exc
+
+
+def _slug(text: str) -> str:
+    slug = re.sub(r"[^\w.-]+", "-", text, flags=re.UNICODE).strip("-.")
+    return slug[:80] or "deck"
+
+
+def _render_incremental(
+    template: LoadedTemplate,
+    plans: List[SlidePlan],
+    content_generator: ContentGenerator,
+    output_dir: Path,
+    output_name: str,
+    title: Optional[str],
+    enable_images: bool,
+    embed_images: bool,
+) -> DeckResult:
+    output_path = output_dir / output_name
+    manifest_path = manifest_path_for(output_path)
+    # Decks built from the skeleton and from the full template have different layouts.
+    template_hash = hash_template(template.path) + ("-skeleton" if template.skeleton else "")
+    # Different expansion backends word the same bullets differently.
+    expander = content_generator.expander
+    settings_hash = f"{settings_fingerprint()}:{expander.backend.name if expander is not None else 'rules'}"
+    if embed_images:
+        settings_hash += ":embedded"
+    fingerprints = [slide_fingerprint(plan, template_hash, settings_hash, enable_images) for plan in plans]
+    previous = DeckManifest.load(manifest_path)
+    if previous is not None and (
+        previous.template_hash != template_hash
+        or not output_path.exists()
+        or hash_template(output_path) != previous.output_hash
+    ):
+        logger.info("Previous deck no longer matches %s; rebuilding every slide", manifest_path.name)
+        previous = None
+
+    previous_positions = previous.match(fingerprints) if previous is not None else [None] * len(plans)
+    slides: List[Optional[GeneratedSlide]] = [
+        previous.slides[position].slide if position is not None else None for position in previous_positions
+    ]
+    changed = [index for index, position in enumerate(previous_positions) if position is None]
+    try:
+        fresh = content_generator.generate([plans[index] for index in changed])
+    finally:
+        failures = content_generator.wait_for_images()
+    if failures:
+        logger.warning("%d images failed; their slides keep text only", failures)
+    for index, slide in zip(changed, fresh):
+        slides[index] = slide
+
+    if previous is None:
+        slide_generator = SlideGenerator(
+            template=template, output_dir=output_dir, output_name=output_name, embed_images=embed_images
+        )
+        slide_generator.add_slides(zip(plans, slides))
+    else:
+        deck = load_deck(template, output_path)
+        slide_generator = SlideGenerator(
+            template=deck, output_dir=output_dir, output_name=output_name, embed_images=embed_images
+        )
+        slide_generator.replace_slides(previous_positions, {index: (plans[index], slides[index]) for index in changed})
+    slide_generator.insert_pictures()
+    if title:
+        slide_generator.presentation.core_properties.title = title
+    output_path = slide_generator.save()
+
+    # Slides whose image failed get no fingerprint so the next run retries them.
+    failed = {id(slide) for slide in content_generator.failed_images}
+    records = [
+        SlideRecord(fingerprint="" if id(slide) in failed else fingerprint, slide=slide)
+        for fingerprint, slide in zip(fingerprints, slides)
+    ]
+    DeckManifest(template_hash=template_hash, output_hash=hash_template(output_path), slides=records).save(manifest_path)
+
+    reused = len(plans) - len(changed)
+    logger.info("Reused %d slides, rebuilt %d", reused, len(changed))
+    image_count = sum(1 for slide in slides if slide.image_path is not None)
+    return DeckResult(
+        output_path=output_path,
+        slide_count=len(plans),
+        image_count=image_count,
+        images_dir=content_generator.images_dir if image_count else None,
+        reused_slides=reused,
+    )
@@ -0,0 +1,139 @@
+"""Multi-process deck rendering with template-affine workers."""
+from __future__ import annotations
+
+import heapq
+import math
+import time
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, TextIO, Union
+
+from agents.batch import BatchJob, BatchReport, BatchResult, BatchRunner, emit_result
+from agents.template_cache import TemplateCache
+from config import settings
+from core.logging import configure_logging, get_logger
+
+logger = get_logger(__name__)
+
+# Per-process runner; populated by the executor initializer so templates stay warm between chunks.
+_WORKER_RUNNER: Optional[BatchRunner] = None
+
+
+def _init_worker(templates: List[Path], cache_dir: Optional[Path], image_cache_dir: Optional[Path]) -> None:
+    global _WORKER_RUNNER
+    configure_logging()
+    cache = TemplateCache(cache_dir) if cache_dir is not None else None
+    _WORKER_RUNNER = BatchRunner(cache=cache, image_cache_dir=image_cache_dir)
+    for template in templates:
+        try:
+            _WORKER_RUNNER.registry.checkout(template)
+        except Exception:  # the jobs themselves will report the failure
+            logger.warning("Unable to preload template %s", template)
+
+
+def _run_chunk(jobs: List[BatchJob]) -> List[BatchResult]:
+    return [_WORKER_RUNNER.run_job(job) for job in jobs]
+
+
+def route_jobs(jobs: List[BatchJob], workers: int) -> List[List[BatchJob]]:
+    """Assign jobs to workers so each template lands on as few workers as possible.
+
+    Jobs are grouped by template; groups larger than a fair share are split into
+    shards, and shards go to the least-loaded worker (largest first).
+    """
+    groups: Dict[Path, List[BatchJob]] = OrderedDict()
+    for job in jobs:
+        groups.setdefault(job.template.resolve(), []).append(job)
+    capacity = max(1, math.ceil(len(jobs) / workers))
+    shards = [
+        group[start : start + capacity]
+        for group in groups.values()
+        for start in range(0, len(group), capacity)
+    ]
+    shards.sort(key=len, reverse=True)
+    assignments: List[List[BatchJob]] = [[] for _ in range(workers)]
+    loads = [(0, index) for index in range(workers)]
+    for shard in shards:
+        load, index = heapq.heappop(loads)
+        assignments[index].extend(shard)
+        heapq.heappush(loads, (load + len(shard), index))
+    return assignments
+
+
+class RenderPool:
+    def __init__(
+        self,
+        workers: int = settings.BATCH_WORKERS,
+        chunk_size: int = settings.BATCH_CHUNK_SIZE,
+        cache_dir: Optional[Path] = None,
+        image_cache_dir: Optional[Path] = None,
+    ) -> None:
+        self.workers = max(1, workers)
+        self.chunk_size = max(1, chunk_size)
+        self.cache_dir = cache_dir
+        self.image_cache_dir = image_cache_dir
+
+    def run(self, jobs: Iterable[Union[BatchJob, BatchResult]], results: Optional[TextIO] = None) -> BatchReport:
+        report = BatchReport()
+        started = time.perf_counter()
+        pending_jobs: List[BatchJob] = []
+        for job in jobs:
+            if isinstance(job, BatchResult):
+                emit_result(report, job, results)
+            else:
+                pending_jobs.append(job)
+
+        assignments = [assigned for assigned in route_jobs(pending_jobs, self.workers) if assigned]
+        executors: List[ProcessPoolExecutor] = []
+        futures: Dict[Future, List[BatchJob]] = {}
+        try:
+            for assigned in assignments:
+                templates = list(OrderedDict.fromkeys(job.template for job in assigned))
+                executor = ProcessPoolExecutor(
+                    max_workers=1,
+                    initializer=_init_worker,
+                    initargs=(templates, self.cache_dir, self.image_cache_dir),
+                )
+                executors.append(executor)
+                for start in range(0, len(assigned), self.chunk_size):
+                    chunk = assigned[start : start + self.chunk_size]
+                    futures[executor.submit(_run_chunk, chunk)] = chunk
+            logger.info(
+                "Dispatched %d jobs to %d workers in chunks of %d",
+                len(pending_jobs),
+                len(executors),
+                self.chunk_size,
+            )
+            remaining = set(futures)
+            while remaining:
+                done, remaining = wait(remaining, return_when=FIRST_COMPLETED)
+                for future in done:
+                    for result in self._collect(future, futures[future]):
+                        emit_result(report, result, results)
+        finally:
+            for executor in executors:
+                executor.shutdown(wait=True)
+
+        report.seconds = time.perf_counter() - started
+        logger.info(
+            "Rendered %d decks (%d failed, %d slides) with %d workers in %.2fs: %.2f decks/s",
+            report.succeeded,
+            report.failed,
+            report.slides,
+            len(executors),
+            report.seconds,
+            report.decks_per_second,
+        )
+        return report
+
+    @staticmethod
+    def _collect(future: Future, chunk: List[BatchJob]) -> List[BatchResult]:
+        try:
+            return future.result()
+        except Exception as exc:  # worker crashed; report the whole chunk and keep the pool going
+            logger.error("Worker failed while rendering %d jobs: %s", len(chunk), exc)
+            return [
+                BatchResult(job_id=job.job_id, status="error", seconds=0.0, error=f"{type(exc).__name__}: {exc}")
+                for job in chunk
+            ]
@@ -1,76 +1,269 @@
 """Slide deck generation."""
 from __future__ import annotations
 
+import re
+from io import BytesIO
 from pathlib import Path
-from typing import Iterable
+from typing import BinaryIO, Dict, Iterable, List, Optional, Sequence, Tuple
+from xml.sax.saxutils import escape
 
-from pptx import Presentation
+from pptx.oxml import parse_xml
+from pptx.oxml.ns import nsdecls
+from pptx.util import Emu
 
+from agents.image_generator import fit_image
+from agents.template_loader import LoadedTemplate
 from config import settings
+from core.fileio import atomic_path
 from core.logging import get_logger
-from core.models import GeneratedSlide, SlidePlan, TemplateSummary
+from core.models import GeneratedSlide, SlidePlan, TemplateLayout
+from core.profiling import timed
 
 logger = get_logger(__name__)
 
+# python-pptx turns these into <a:br/> elements or _xHHHH_ escapes; leave them to it.
+_CONTROL_CHARS = re.compile("[\x00-\x1f]")
+
 
 class SlideGenerator:
-    def __init__(self, template_path: Path, template_summary: TemplateSummary, output_dir: Path) -> None:
-        self.template_path = template_path
-        self.template_summary = template_summary
+    def __init__(
+        self,
+        template: LoadedTemplate,
+        output_dir: Path,
+        output_name: str = settings.PRESENTATION_NAME,
+        embed_images: bool = settings.EMBED_IMAGES,
+    ) -> None:
+        self.template = template
+        self.template_path = template.path
+        self.template_summary = template.summary
         self.output_dir = output_dir
-        self.output_dir.mkdir(parents=True, exist_ok=True)
-        self.output_path = self.output_dir / settings.PRESENTATION_NAME
-        self.presentation = Presentation(self.template_path)
-
-    def build(self, plans: Iterable[SlidePlan], generated_content: Iterable[GeneratedSlide]) -> Path:
-        for plan, content in zip(plans, generated_content):
-            layout = self.presentation.slide_layouts[plan.layout.index]
-            slide = self.presentation.slides.add_slide(layout)
-            self._apply_title(slide, content.title)
-            self._apply_body(slide, content.bullet_sentences)
-            self._apply_notes(slide, content)
+        self.output_path = self.output_dir / output_name
+        self.presentation = template.presentation
+        # layout index -> {role: placeholder idx}, resolved once per layout
+        self._role_cache: Dict[int, Dict[str, int]] = {}
+        self.embed_images = embed_images
+        # (picture placeholder, image path) waiting for insert_pictures()
+        self._pictures: List[Tuple[object, Path]] = []
+        # Fitted image bytes by (image file name, pixel size), so each image is resized once.
+        self._fitted: Dict[Tuple[str, int, int], bytes] = {}
+        # id(content) -> slide id of slides whose notes name an image that may still fail
+        self._image_note_slides: Dict[int, int] = {}
+
+    def build(
+        self,
+        plans: Iterable[SlidePlan],
+        generated_content: Iterable[GeneratedSlide],
+        output: Optional[BinaryIO] = None,
+    ) -> Optional[Path]:
+        self.add_slides(zip(plans, generated_content))
+        return self.save(output)
+
+    @timed("slides.build", items=lambda count: count)
+    def add_slides(self, slides: Iterable[Tuple[SlidePlan, GeneratedSlide]]) -> int:
+        count = 0
+        for plan, content in slides:
+            self._add_slide(plan, content)
+            count += 1
+        return count
+
+    @timed("slides.replace", items=lambda count: count)
+    def replace_slides(
+        self,
+        previous_positions: List[Optional[int]],
+        changed: Dict[int, Tuple[SlidePlan, GeneratedSlide]],
+    ) -> int:
+        """Rearrange a previously generated deck into a new slide order.
+
+        Position ``i`` keeps the old slide at ``previous_positions[i]`` untouched, or gets a
+        freshly built slide from ``changed[i]`` when that entry is None. Old slides that
+        are not referenced are dropped. Returns the number of slides built.
+        """
+        id_list = self.presentation.slides._sldIdLst
+        existing = list(id_list)
+        ordered = []
+        for position, previous in enumerate(previous_positions):
+            if previous is None:
+                self._add_slide(*changed[position])
+                ordered.append(id_list[-1])
+            else:
+                ordered.append(existing[previous])
+        keep = set(ordered)
+        for entry in existing:
+            if entry not in keep:
+                id_list.remove(entry)
+                self.presentation.part.drop_rel(entry.rId)
+        # Appending an existing element moves it, which leaves the ids in deck order.
+        for entry in ordered:
+            id_list.append(entry)
+        return len(changed)
+
+    def _add_slide(self, plan: SlidePlan, content: GeneratedSlide) -> None:
+        layout = self.template.layouts[plan.layout.index]
+        slide = self.presentation.slides.add_slide(layout)
+        roles = self._roles_for(plan.layout)
+        self._apply_title(slide, roles, content.title)
+        self._apply_body(slide, roles, content.bullet_sentences)
+        self._apply_notes(slide, content)
+        if self.embed_images and content.image_path is not None:
+            placeholder = self._get_placeholder(slide, roles, "picture")
+            if placeholder is not None:
+                self._pictures.append((placeholder, content.image_path))
+
+    @timed("slides.pictures", items=lambda count: count)
+    def insert_pictures(self, images: Optional[Dict[str, bytes]] = None) -> int:
+        """Fill the picture placeholders of the slides added so far; returns how many were filled.
+
+        Call once the slide images are rendered; ``images`` holds in-memory PNGs by
+        file name. Each image is downscaled to its placeholder at EMBED_IMAGE_DPI;
+        python-pptx stores identical bytes as one media part, however many slides
+        show them. Slides whose image is missing keep the empty placeholder.
+        """
+        placed = 0
+        pictures, self._pictures = self._pictures, []
+        for placeholder, image_path in pictures:
+            blob = images.get(image_path.name) if images else None
+            if blob is None and image_path.exists():
+                blob = image_path.read_bytes()
+            if blob is None:
+                logger.debug("Image %s is missing; leaving the picture placeholder empty", image_path)
+                continue
+            fitted = self._fitted_image(image_path.name, blob, placeholder.width, placeholder.height)
+            placeholder.insert_picture(BytesIO(fitted))
+            placed += 1
+        if placed:
+            logger.info("Embedded %d pictures from %d fitted images", placed, len(self._fitted))
+        return placed
+
+    def _fitted_image(self, name: str, blob: bytes, width: Emu, height: Emu) -> bytes:
+        size = (
+            max(1, round(Emu(width).inches * settings.EMBED_IMAGE_DPI)),
+            max(1, round(Emu(height).inches * settings.EMBED_IMAGE_DPI)),
+        )
+        key = (name, *size)
+        fitted = self._fitted.get(key)
+        if fitted is None:
+            fitted = self._fitted[key] = fit_image(blob, *size)
+        return fitted
+
+    @timed("presentation.save")
+    def save(self, output: Optional[BinaryIO] = None) -> Optional[Path]:
+        """Write the deck to ``output_path``, or to the binary stream ``output`` and return None.
+
+        Streams only need ``write``; pipes, sockets and BytesIO all work.
+        """
+        if output is not None:
+            logger.info("Writing presentation to stream")
+            self.presentation.save(output)
+            return None
         logger.info("Writing presentation to %s", self.output_path)
-        self.presentation.save(self.output_path)
+        # Concurrent jobs and crashes must never expose a half-written deck.
+        with atomic_path(self.output_path) as tmp_path:
+            self.presentation.save(tmp_path)
         return self.output_path
 
-    def _apply_title(self, slide, text: str) -> None:
-        placeholder = self._get_placeholder(slide, {"title", "centertitle"})
+    def _apply_title(self, slide, roles: Dict[str, int], text: str) -> None:
+        placeholder = self._get_placeholder(slide, roles, "title")
         if placeholder is None:
             logger.debug("No title placeholder found; skipping title")
             return
         placeholder.text = text
 
-    def _apply_body(self, slide, bullets) -> None:
-        placeholder = self._get_placeholder(slide, {"body", "content"})
+    def _apply_body(self, slide, roles: Dict[str, int], bullets) -> None:
+        placeholder = self._get_placeholder(slide, roles, "body")
         if placeholder is None:
             logger.debug("No body placeholder found; skipping bullet content")
             return
-        text_frame = placeholder.text_frame
-        if not bullets:
-            text_frame.text = ""
-            return
-        text_frame.clear()
-        first, *rest = bullets
-        text_frame.text = first
-        for sentence in rest:
-            paragraph = text_frame.add_paragraph()
-            paragraph.text = sentence
-            paragraph.level = 0
+        write_paragraphs(placeholder.text_frame, list(bullets), level_props=True)
+
+    def drop_image_notes(self, failed: Iterable[GeneratedSlide]) -> int:
+        """Rewrite the notes of slides whose image failed after they were added.
+
+        Deferred and streamed images settle after their slides are built, so the
+        notes may name a file that was never written. Call once the images are
+        settled and before saving; returns the number of notes rewritten.
+        """
+        count = 0
+        for content in failed:
+            slide_id = self._image_note_slides.pop(id(content), None)
+            if slide_id is None or content.image_path is not None:
+                continue
+            slide = self.presentation.slides.get(slide_id)
+            if slide is not None:
+                write_paragraphs(slide.notes_slide.notes_text_frame, self._notes_lines(content))
+                count += 1
+        return count
 
     def _apply_notes(self, slide, content: GeneratedSlide) -> None:
-        notes = slide.notes_slide
-        notes_frame = notes.notes_text_frame
-        notes_frame.clear()
-        notes_frame.text = f"Outline: {content.outline.title}"
         if content.image_path:
-            notes_frame.add_paragraph().text = f"Image: {content.image_path}"
-        for key, value in content.notes.items():
-            notes_frame.add_paragraph().text = f"{key}: {value}"
+            self._image_note_slides[id(content)] = slide.slide_id
+        write_paragraphs(slide.notes_slide.notes_text_frame, self._notes_lines(content))
+
+    def _notes_lines(self, content: GeneratedSlide) -> List[str]:
+        lines = [f"Outline: {content.outline.title}"]
+        if content.image_path:
+            lines.append(f"Image: {content.image_path}")
+        lines.extend(f"{key}: {value}" for key, value in content.notes.items())
+        return lines
+
+    def _roles_for(self, layout: TemplateLayout) -> Dict[str, int]:
+        roles = self._role_cache.get(layout.index)
+        if roles is None:
+            # The analyzer records the first placeholder of each type in layout order,
+            # which is also the order add_slide clones them onto the slide.
+            placeholders = self.template.placeholder_map.get(layout.index, layout.placeholders)
+            roles = {}
+            for role, accepted_types in settings.PLACEHOLDER_ROLES.items():
+                for placeholder_type, idx in placeholders.items():
+                    if placeholder_type in accepted_types:
+                        roles[role] = idx
+                        break
+            self._role_cache[layout.index] = roles
+        return roles
 
-    def _get_placeholder(self, slide, accepted_types):
-        for placeholder in slide.placeholders:
-            placeholder_type = getattr(placeholder.placeholder_format.type, "name", "").lower()
-            if placeholder_type in accepted_types:
-                return placeholder
-        return None
+    def _get_placeholder(self, slide, roles: Dict[str, int], role: str):
+        idx = roles.get(role)
+        if idx is None:
+            return None
+        try:
+            return slide.placeholders[idx]
+        except KeyError:
+            return None
 
+
+def write_paragraphs(text_frame, lines: Sequence[str], level_props: bool = False) -> None:
+    """Replace the paragraphs of ``text_frame`` with one plain run per line.
+
+    The ``<a:p>`` list is built as a single XML fragment and parsed once, which is
+    much cheaper than clear() plus add_paragraph() per line. Body and list style are
+    left alone, so the text keeps the template's formatting. ``level_props`` adds the
+    empty ``<a:pPr/>`` that setting ``paragraph.level`` leaves on every paragraph
+    after the first. Lines with control characters take the python-pptx path.
+    """
+    if any(_CONTROL_CHARS.search(line) for line in lines):
+        _write_paragraphs_slow(text_frame, lines, level_props)
+        return
+    paragraphs = []
+    for position, line in enumerate(lines or [""]):
+        props = "<a:pPr/>" if level_props and position else ""
+        run = f"<a:r><a:t>{escape(line)}</a:t></a:r>" if line else ""
+        paragraphs.append(f"<a:p>{props}{run}</a:p>")
+    fragment = parse_xml(f"<a:txBody {nsdecls('a')}>{''.join(paragraphs)}</a:txBody>")
+    tx_body = text_frame._txBody
+    for paragraph in tx_body.p_lst:
+        tx_body.remove(paragraph)
+    tx_body.extend(list(fragment))
+
+
+def _write_paragraphs_slow(text_frame, lines: Sequence[str], level_props: bool = False) -> None:
+    """The python-pptx object-layer equivalent of write_paragraphs()."""
+    text_frame.clear()
+    if not lines:
+        text_frame.text = ""
+        return
+    first, *rest = lines
+    text_frame.text = first
+    for line in rest:
+        paragraph = text_frame.add_paragraph()
+        paragraph.text = line
+        if level_props:
+            paragraph.level = 0
@@ -1,35 +1,72 @@
 """Template analysis utilities."""
 from __future__ import annotations
 
+import posixpath
+import zipfile
 from pathlib import Path
-from typing import List
-
-from pptx import Presentation
+from typing import Dict, Iterator, List, Optional, Tuple
+from xml.etree import ElementTree
 
 from config import settings
 from core.logging import get_logger
 from core.models import TemplateLayout, TemplateSummary
+from core.profiling import timed
 
 logger = get_logger(__name__)
 
+_P = "{http://schemas.openxmlformats.org/presentationml/2006/main}"
+_R_ID = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}id"
+_RELS = "{http://schemas.openxmlformats.org/package/2006/relationships}Relationship"
+_OFFICE_DOCUMENT = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"
+_SHAPE_TAGS = frozenset(_P + tag for tag in ("sp", "grpSp", "graphicFrame", "cxnSp", "pic", "contentPart"))
+# ST_PlaceholderType values -> lowercased PP_PLACEHOLDER names, as python-pptx reports them.
+_PLACEHOLDER_TYPES = {
+    "body": "body",
+    "chart": "chart",
+    "clipArt": "bitmap",
+    "ctrTitle": "center_title",
+    "dgm": "org_chart",
+    "dt": "date",
+    "ftr": "footer",
+    "hdr": "header",
+    "media": "media_clip",
+    "obj": "object",
+    "pic": "picture",
+    "sldImg": "slide_image",
+    "sldNum": "slide_number",
+    "subTitle": "subtitle",
+    "tbl": "table",
+    "title": "title",
+}
+
 
 class TemplateAnalyzer:
-    def __init__(self, template_path: Path) -> None:
+    # Bump whenever the produced TemplateSummary changes shape or semantics so
+    # cached analyses from older versions are ignored.
+    VERSION = 2
+
+    def __init__(self, template_path: Path, presentation=None, fast: bool = False) -> None:
         self.template_path = template_path
+        self.presentation = presentation
+        # Read layout XML straight from the zip instead of building the python-pptx object graph.
+        self.fast = fast and presentation is None
 
+    @timed("template.analyze", items=lambda summary: len(summary.layouts))
     def analyze(self) -> TemplateSummary:
         logger.info("Analyzing template %s", self.template_path)
-        presentation = Presentation(self.template_path)
+        if self.fast:
+            raw_layouts = list(_read_package_layouts(self.template_path))
+        else:
+            raw_layouts = list(self._read_presentation_layouts())
         layouts: List[TemplateLayout] = []
-        for index, layout in enumerate(presentation.slide_layouts):
-            name = (layout.name or f"Layout {index}").strip()
+        for index, (raw_name, placeholder_list) in enumerate(raw_layouts):
+            name = (raw_name or f"Layout {index}").strip()
             layout_key = name.lower()
             normalized_kind = settings.COMMON_LAYOUT_ALIASES.get(layout_key, "other")
             placeholders = {}
-            for placeholder in layout.placeholders:
-                fmt = placeholder.placeholder_format
-                placeholder_type = getattr(fmt.type, "name", "unknown").lower()
-                placeholders[placeholder_type] = fmt.idx
+            for placeholder_type, idx in placeholder_list:
+                # Keep the first placeholder of each type, matching slide lookup order.
+                placeholders.setdefault(placeholder_type, idx)
             is_common = normalized_kind in {"title", "content", "content_two"}
             layouts.append(
                 TemplateLayout(
@@ -43,3 +80,108 @@ class TemplateAnalyzer:
         logger.info("Discovered %d layouts", len(layouts))
         return TemplateSummary(layouts=layouts)
 
+    def _read_presentation_layouts(self) -> Iterator[Tuple[str, List[Tuple[str, int]]]]:
+        presentation = self.presentation
+        if presentation is None:
+            # Imported here so cache hits never pay for loading python-pptx.
+            from pptx import Presentation
+
+            presentation = Presentation(self.template_path)
+        for layout in presentation.slide_layouts:
+            placeholders = []
+            for placeholder in layout.placeholders:
+                fmt = placeholder.placeholder_format
+                placeholders.append((getattr(fmt.type, "name", "unknown").lower(), fmt.idx))
+            yield layout.name, placeholders
+
+
+def _read_package_layouts(template_path: Path) -> Iterator[Tuple[str, List[Tuple[str, int]]]]:
+    """Yield (name, [(placeholder type, idx)]) for the first master's layouts, in order.
+
+    Only the package and presentation relationships, presentation.xml, the first
+    master and its layouts are read; media and slides are never opened.
+    """
+    with zipfile.ZipFile(template_path) as package:
+        root_targets = _relationship_targets(package, "")
+        document = next((target for target, kind in root_targets.values() if kind == _OFFICE_DOCUMENT), None)
+        if document is None:
+            raise ValueError(f"{template_path} is not a presentation package")
+        master_ids = [
+            element.get(_R_ID)
+            for element in _iter_starts(package, document, _P + "sldMasterId", stop=_P + "sldMasterIdLst")
+        ]
+        if not master_ids:
+            return
+        master = _relationship_targets(package, document)[master_ids[0]][0]
+        master_targets = _relationship_targets(package, master)
+        for element in _iter_starts(package, master, _P + "sldLayoutId", stop=_P + "sldLayoutIdLst"):
+            yield _read_layout(package, master_targets[element.get(_R_ID)][0])
+
+
+def _relationship_targets(package: zipfile.ZipFile, part: str) -> Dict[str, Tuple[str, str]]:
+    """Map rId -> (part name, relationship type) for the internal relationships of ``part``."""
+    directory, name = posixpath.split(part)
+    try:
+        data = package.read(posixpath.join(directory, "_rels", f"{name}.rels"))
+    except KeyError:
+        return {}
+    targets = {}
+    for relationship in ElementTree.fromstring(data).iter(_RELS):
+        if relationship.get("TargetMode") == "External":
+            continue
+        target = relationship.get("Target", "")
+        resolved = target.lstrip("/") if target.startswith("/") else posixpath.normpath(posixpath.join(directory, target))
+        targets[relationship.get("Id")] = (resolved, relationship.get("Type", ""))
+    return targets
+
+
+def _iter_starts(package: zipfile.ZipFile, part: str, tag: str, stop: str) -> Iterator:
+    """Stream ``part`` and yield each ``tag`` element, stopping at the end of ``stop``."""
+    with package.open(part) as stream:
+        for event, element in ElementTree.iterparse(stream, events=("start", "end")):
+            if event == "start":
+                if element.tag == tag:
+                    yield element
+            elif element.tag == stop:
+                return
+            else:
+                element.clear()
+
+
+def _read_layout(package: zipfile.ZipFile, part: str) -> Tuple[str, List[Tuple[str, int]]]:
+    """Read a layout's name and the placeholders of its top-level shapes in document order.
+
+    Mirrors python-pptx: a shape is a placeholder when its first child has
+    ``p:nvPr/p:ph``; a missing type means "obj" and a missing idx means 0.
+    """
+    name: Optional[str] = None
+    placeholders: List[Tuple[str, int]] = []
+    # Depths: 1 sldLayout, 2 cSld, 3 spTree, 4 shape, 5 its nv*Pr, 6 nvPr, 7 ph.
+    depth = 0
+    in_shape = first_child = in_nv_pr = False
+    child_count = 0
+    with package.open(part) as stream:
+        for event, element in ElementTree.iterparse(stream, events=("start", "end")):
+            if event == "end":
+                depth -= 1
+                if element.tag == _P + "spTree":
+                    break
+                element.clear()
+                continue
+            depth += 1
+            tag = element.tag
+            if depth == 2 and tag == _P + "cSld":
+                name = element.get("name", "")
+            elif depth == 4:
+                in_shape = tag in _SHAPE_TAGS
+                child_count = 0
+            elif depth == 5 and in_shape:
+                child_count += 1
+                first_child = child_count == 1
+            elif depth == 6 and in_shape:
+                in_nv_pr = first_child and tag == _P + "nvPr"
+            elif depth == 7 and in_shape and in_nv_pr and tag == _P + "ph":
+                placeholder_type = _PLACEHOLDER_TYPES.get(element.get("type", "obj"), "unknown")
+                placeholders.append((placeholder_type, int(element.get("idx", "0"))))
+                in_nv_pr = False
+    return name or "", placeholders
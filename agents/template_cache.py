@@ -0,0 +1,154 @@
+"""Persistent on-disk cache for template analysis results."""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from dataclasses import asdict
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from agents import template_skeleton as skeleton
+from agents.template_analyzer import TemplateAnalyzer
+from config import settings
+from core.fileio import atomic_path
+from core.logging import get_logger
+from core.models import TemplateLayout, TemplateSummary
+
+logger = get_logger(__name__)
+
+_HASH_CHUNK_SIZE = 1 << 20
+# Settings the cached layout kinds and the pruned skeleton are derived from.
+_KEY_SETTINGS = ("COMMON_LAYOUT_ALIASES", "FALLBACK_LAYOUT_KEY")
+
+
+def hash_template(template_path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(template_path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(_HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _settings_digest() -> str:
+    values = {name: getattr(settings, name) for name in _KEY_SETTINGS}
+    return hashlib.sha256(json.dumps(values, sort_keys=True).encode("utf-8")).hexdigest()[:12]
+
+
+def summary_to_dict(summary: TemplateSummary) -> Dict:
+    return {"layouts": [asdict(layout) for layout in summary.layouts]}
+
+
+def summary_from_dict(payload: Dict) -> TemplateSummary:
+    return TemplateSummary(layouts=[TemplateLayout(**layout) for layout in payload["layouts"]])
+
+
+class TemplateCache:
+    """Stores serialized TemplateSummary objects keyed by template hash, analyzer version
+    and a digest of the layout settings the analysis depends on.
+
+    Skeleton packages (see agents.template_skeleton) are stored next to their analysis
+    and share its key, so eviction and invalidation treat them as one entry.
+    """
+
+    def __init__(self, cache_dir: Path, max_entries: int = settings.TEMPLATE_CACHE_MAX_ENTRIES) -> None:
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        # (path, size, mtime) -> content hash, so one run hashes each template once
+        self._hashes: Dict[Tuple[str, int, int], str] = {}
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def key_for(self, template_path: Path) -> str:
+        stat = template_path.stat()
+        memo_key = (str(template_path.resolve()), stat.st_size, stat.st_mtime_ns)
+        digest = self._hashes.get(memo_key)
+        if digest is None:
+            digest = self._hashes[memo_key] = hash_template(template_path)
+        return f"{digest}-v{TemplateAnalyzer.VERSION}-s{_settings_digest()}"
+
+    def skeleton_path(self, template_path: Path) -> Path:
+        return self.cache_dir / f"{self.key_for(template_path)}.skeleton-v{skeleton.VERSION}.pptx"
+
+    def put_skeleton(self, template_path: Path, presentation) -> Path:
+        entry = self.skeleton_path(template_path)
+        with atomic_path(entry) as tmp_path:
+            presentation.save(tmp_path)
+        return entry
+
+    def get(self, template_path: Path) -> Optional[TemplateSummary]:
+        entry = self._entry_path(self.key_for(template_path))
+        try:
+            payload = json.loads(entry.read_text(encoding="utf-8"))
+            summary = summary_from_dict(payload)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except (ValueError, KeyError, TypeError):
+            logger.warning("Discarding corrupt template cache entry %s", entry)
+            entry.unlink(missing_ok=True)
+            self.misses += 1
+            return None
+        self.hits += 1
+        # Refresh the access time so eviction keeps recently used templates.
+        os.utime(entry)
+        return summary
+
+    def put(self, template_path: Path, summary: TemplateSummary) -> Path:
+        entry = self._entry_path(self.key_for(template_path))
+        payload = summary_to_dict(summary)
+        payload["template"] = str(template_path)
+        with atomic_path(entry) as tmp_path:
+            tmp_path.write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
+        self._evict()
+        return entry
+
+    def get_or_analyze(self, template_path: Path, presentation=None, fast: bool = False) -> TemplateSummary:
+        summary = self.get(template_path)
+        if summary is not None:
+            logger.info("Template cache hit for %s", template_path)
+            return summary
+        summary = TemplateAnalyzer(template_path, presentation=presentation, fast=fast).analyze()
+        self.put(template_path, summary)
+        return summary
+
+    def invalidate(self, template_path: Path) -> bool:
+        entry = self._entry_path(self.key_for(template_path))
+        self._drop_skeletons(entry)
+        if not entry.exists():
+            return False
+        entry.unlink()
+        return True
+
+    def clear(self) -> int:
+        removed = 0
+        for entry in self.cache_dir.glob("*.json"):
+            entry.unlink(missing_ok=True)
+            removed += 1
+        for skeleton_entry in self.cache_dir.glob("*.skeleton-v*.pptx"):
+            skeleton_entry.unlink(missing_ok=True)
+        return removed
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": sum(1 for _ in self.cache_dir.glob("*.json")),
+        }
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def _evict(self) -> None:
+        if self.max_entries <= 0:
+            return
+        entries = sorted(self.cache_dir.glob("*.json"), key=lambda path: path.stat().st_mtime)
+        for entry in entries[: max(0, len(entries) - self.max_entries)]:
+            logger.debug("Evicting template cache entry %s", entry)
+            entry.unlink(missing_ok=True)
+            self._drop_skeletons(entry)
+
+    def _drop_skeletons(self, entry: Path) -> None:
+        for skeleton_entry in self.cache_dir.glob(f"{entry.stem}.skeleton-v*.pptx"):
+            skeleton_entry.unlink(missing_ok=True)
@@ -0,0 +1,118 @@
+"""Shared template loading so each run parses the template package once."""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from io import BytesIO
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from pptx import Presentation
+
+from agents.template_analyzer import TemplateAnalyzer
+from agents.template_cache import TemplateCache
+from agents.template_skeleton import prune_presentation, skeleton_summary
+from config import settings
+from core.logging import get_logger
+from core.models import TemplateSummary
+from core.profiling import get_profiler
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class LoadedTemplate:
+    path: Path
+    presentation: Any
+    summary: TemplateSummary
+    layouts: List[Any] = field(default_factory=list)
+    placeholder_map: Dict[int, Dict[str, int]] = field(default_factory=dict)
+    # True when presentation/summary are the pruned skeleton rather than the full template
+    skeleton: bool = False
+
+
+def load_template(
+    template_path: Path,
+    cache: Optional[TemplateCache] = None,
+    skeleton: bool = settings.TEMPLATE_SKELETON,
+) -> LoadedTemplate:
+    """Load a template and its analysis.
+
+    With ``skeleton`` the template is pruned to what LayoutMatcher can use (see
+    agents.template_skeleton); the skeleton package is cached, so later runs load it
+    instead of the full template.
+    """
+    logger.info("Loading template %s", template_path)
+    profiler = get_profiler()
+    if skeleton and cache is not None:
+        skeleton_path = cache.skeleton_path(template_path)
+        summary = cache.get(template_path) if skeleton_path.exists() else None
+        if summary is not None:
+            with profiler.stage("template.load"):
+                presentation = Presentation(skeleton_path)
+            return _wrap(template_path, presentation, skeleton_summary(summary), skeleton=True)
+    with profiler.stage("template.load"):
+        presentation = Presentation(template_path)
+    if cache is not None:
+        summary = cache.get_or_analyze(template_path, presentation=presentation)
+    else:
+        summary = TemplateAnalyzer(template_path, presentation=presentation).analyze()
+    if not skeleton:
+        return _wrap(template_path, presentation, summary)
+    with profiler.stage("template.prune"):
+        pruned = prune_presentation(presentation, summary)
+        if cache is not None:
+            cache.put_skeleton(template_path, presentation)
+    return _wrap(template_path, presentation, pruned, skeleton=True)
+
+
+def load_deck(template: LoadedTemplate, deck_path: Path) -> LoadedTemplate:
+    """Open a deck previously generated from ``template`` so its slides can be updated in place.
+
+    Generated decks keep the template's layouts in order, so the template analysis applies as is.
+    """
+    with get_profiler().stage("template.load"):
+        presentation = Presentation(deck_path)
+    return _wrap(template.path, presentation, template.summary, skeleton=template.skeleton)
+
+
+def _wrap(template_path: Path, presentation, summary: TemplateSummary, skeleton: bool = False) -> LoadedTemplate:
+    return LoadedTemplate(
+        path=template_path,
+        presentation=presentation,
+        summary=summary,
+        layouts=list(presentation.slide_layouts),
+        placeholder_map={layout.index: dict(layout.placeholders) for layout in summary.layouts},
+        skeleton=skeleton,
+    )
+
+
+class TemplateRegistry:
+    """Keeps template bytes and analyses in memory for reuse across decks.
+
+    Every checkout returns a fresh Presentation because SlideGenerator mutates it.
+    """
+
+    def __init__(self, cache: Optional[TemplateCache] = None, skeleton: bool = settings.TEMPLATE_SKELETON) -> None:
+        self.cache = cache
+        self.skeleton = skeleton
+        self._entries: Dict[Path, Tuple[bytes, TemplateSummary]] = {}
+
+    def __contains__(self, template_path: Path) -> bool:
+        return Path(template_path).resolve() in self._entries
+
+    def checkout(self, template_path: Path) -> LoadedTemplate:
+        key = Path(template_path).resolve()
+        entry = self._entries.get(key)
+        if entry is None:
+            template = load_template(template_path, cache=self.cache, skeleton=self.skeleton)
+            if template.skeleton:
+                # Keep the pruned package so later checkouts parse the smaller file.
+                buffer = BytesIO()
+                template.presentation.save(buffer)
+                data = buffer.getvalue()
+            else:
+                data = key.read_bytes()
+            self._entries[key] = (data, template.summary)
+            return template
+        data, summary = entry
+        return _wrap(template_path, Presentation(BytesIO(data)), summary, skeleton=self.skeleton)
@@ -0,0 +1,71 @@
+"""Skeleton templates: the template package stripped down to what rendering can use."""
+from __future__ import annotations
+
+from dataclasses import replace
+from typing import List
+
+from agents.layout_matcher import LayoutMatcher
+from core.logging import get_logger
+from core.models import TemplateSummary
+
+logger = get_logger(__name__)
+
+# Bump whenever pruning changes so cached skeletons from older versions are rebuilt.
+VERSION = 1
+
+_P14_NS = "http://schemas.microsoft.com/office/powerpoint/2010/main"
+
+
+def skeleton_summary(summary: TemplateSummary) -> TemplateSummary:
+    """Return the layouts LayoutMatcher can select, renumbered to their skeleton positions.
+
+    Each selectable layout is the first of its kind (or name) in the full template, so
+    matching against the skeleton summary picks the same layouts.
+    """
+    kept = LayoutMatcher(summary).selectable_layouts()
+    return TemplateSummary(layouts=[replace(layout, index=index) for index, layout in enumerate(kept)])
+
+
+def prune_presentation(presentation, summary: TemplateSummary) -> TemplateSummary:
+    """Strip ``presentation`` in place to its skeleton and return the matching summary.
+
+    Example slides, layouts the matcher never selects and every master but the first
+    are removed. Parts only they referenced (media, themes) are no longer reachable,
+    so python-pptx leaves them out when the package is saved.
+    """
+    kept = {layout.index for layout in LayoutMatcher(summary).selectable_layouts()}
+    _drop_slides(presentation)
+    layouts = presentation.slide_layouts
+    for index, layout in reversed(list(enumerate(layouts))):
+        if index not in kept:
+            layouts.remove(layout)
+    _drop_extra_masters(presentation)
+    logger.info("Pruned template to %d of %d layouts", len(kept), len(summary.layouts))
+    return skeleton_summary(summary)
+
+
+def _drop_slides(presentation) -> None:
+    id_list = presentation.slides._sldIdLst
+    removed_ids = set()
+    for entry in list(id_list):
+        removed_ids.add(entry.get("id"))
+        id_list.remove(entry)
+        presentation.part.drop_rel(entry.rId)
+    if not removed_ids:
+        return
+    root = presentation.part._element
+    # Sections and custom shows would otherwise point at slides that no longer exist.
+    for section_entry in list(root.iter(f"{{{_P14_NS}}}sldId")):
+        if section_entry.get("id") in removed_ids:
+            section_entry.getparent().remove(section_entry)
+    for custom_shows in root.findall("{http://schemas.openxmlformats.org/presentationml/2006/main}custShowLst"):
+        root.remove(custom_shows)
+
+
+def _drop_extra_masters(presentation) -> None:
+    # Only the first master's layouts are analyzed, so later masters are never used.
+    master_ids: List = list(presentation.part._element.get_or_add_sldMasterIdLst())
+    for entry in master_ids[1:]:
+        entry.getparent().remove(entry)
+        presentation.part.drop_rel(entry.rId)
+
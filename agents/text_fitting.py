@@ -0,0 +1,277 @@
+"""Text measurement with memoized glyph widths, for pagination and image text layout."""
+from __future__ import annotations
+
+import threading
+import unicodedata
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+try:
+    from PIL import ImageFont
+except ImportError:  # pragma: no cover - optional dependency
+    ImageFont = None  # type: ignore
+
+from config import settings
+from core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Glyph widths are measured once at this size and scaled linearly.
+_REFERENCE_SIZE = 100
+# Used when no font file can be loaded: average Latin advance in ems.
+_FALLBACK_ADVANCE = 0.55
+_MEMO_LIMIT = 65536
+_A = "{http://schemas.openxmlformats.org/drawingml/2006/main}"
+_P = "{http://schemas.openxmlformats.org/presentationml/2006/main}"
+_EMU_PER_POINT = 12700
+
+
+def _is_wide(char: str) -> bool:
+    return unicodedata.east_asian_width(char) in ("W", "F")
+
+
+class _Advances(dict):
+    """char -> advance in ems; measures each character the first time it is asked for."""
+
+    def __init__(self, font, lock: threading.Lock) -> None:
+        super().__init__()
+        self._font = font
+        self._lock = lock
+
+    def __missing__(self, char: str) -> float:
+        # CJK fonts set full-width glyphs on a 1 em grid, and most Latin fonts lack them entirely.
+        if _is_wide(char):
+            advance = 1.0
+        elif self._font is None:
+            advance = 0.3 if char.isspace() else _FALLBACK_ADVANCE
+        else:
+            # FreeType faces are not thread safe; misses are rare once the table is warm.
+            with self._lock:
+                advance = self._font.getlength(char) / _REFERENCE_SIZE
+        self[char] = advance
+        return advance
+
+
+class GlyphMetrics:
+    """Advance widths of one font, measured once per character and shared by all sizes."""
+
+    def __init__(self, font_file: Optional[str]) -> None:
+        self.font_file = font_file
+        font = None
+        if ImageFont is not None and font_file:
+            try:
+                font = ImageFont.truetype(font_file, _REFERENCE_SIZE)
+            except OSError:
+                logger.debug("Font %s not found; estimating glyph widths", font_file)
+        self.exact = font is not None
+        self._advances = _Advances(font, threading.Lock())
+        self._widths: Dict[str, float] = {}
+
+    def width(self, text: str, size: float) -> float:
+        """Rendered width of ``text`` at ``size`` (in the unit of ``size``), ignoring kerning."""
+        ems = self._widths.get(text)
+        if ems is None:
+            if len(self._widths) >= _MEMO_LIMIT:
+                self._widths.clear()
+            ems = self._widths[text] = sum(map(self._advances.__getitem__, text))
+        return ems * size
+
+    def wrap(self, text: str, size: float, max_width: float) -> List[str]:
+        """Greedy line breaking: Latin text breaks at spaces, CJK text between any two characters.
+
+        Words wider than a line are broken between characters. Explicit newlines are kept.
+        """
+        lines: List[str] = []
+        for paragraph in text.split("\n"):
+            lines.extend(self._wrap_paragraph(paragraph, size, max_width))
+        return lines
+
+    def _wrap_paragraph(self, text: str, size: float, max_width: float) -> List[str]:
+        lines: List[str] = []
+        parts: List[str] = []
+        width = 0.0
+        pending = ""  # spaces waiting for the next word on the same line
+        for unit in _break_units(text):
+            if unit.isspace():
+                if parts:
+                    pending += unit
+                continue
+            unit_width = self.width(unit, size)
+            gap = self.width(pending, size) if pending else 0.0
+            if parts and width + gap + unit_width > max_width:
+                lines.append("".join(parts))
+                parts, width, gap, pending = [], 0.0, 0.0, ""
+            if pending:
+                parts.append(pending)
+                width += gap
+                pending = ""
+            if unit_width > max_width and len(unit) > 1:
+                # A word wider than the line: break it between characters.
+                for char in unit:
+                    char_width = self.width(char, size)
+                    if parts and width + char_width > max_width:
+                        lines.append("".join(parts))
+                        parts, width = [], 0.0
+                    parts.append(char)
+                    width += char_width
+                continue
+            parts.append(unit)
+            width += unit_width
+        if parts or not lines:
+            lines.append("".join(parts))
+        return lines
+
+
+def _break_units(text: str) -> Iterable[str]:
+    """Split text into runs of spaces, single wide characters and Latin words."""
+    word = ""
+    for char in text:
+        if char.isspace() or _is_wide(char):
+            if word:
+                yield word
+                word = ""
+            yield char
+        else:
+            word += char
+    if word:
+        yield word
+
+
+_metrics: Dict[Optional[str], GlyphMetrics] = {}
+_metrics_lock = threading.Lock()
+
+
+def get_metrics(font_file: Optional[str]) -> GlyphMetrics:
+    """The shared GlyphMetrics for a font file (None estimates widths without a font)."""
+    metrics = _metrics.get(font_file)
+    if metrics is None:
+        with _metrics_lock:
+            metrics = _metrics.get(font_file)
+            if metrics is None:
+                metrics = _metrics[font_file] = GlyphMetrics(font_file)
+    return metrics
+
+
+@dataclass(frozen=True, slots=True)
+class TextBox:
+    """The usable text area of a placeholder, in points."""
+
+    width: float
+    height: float
+    font_size: float = settings.BODY_FONT_SIZE_PT
+    # Extra space before each paragraph, as a fraction of a line
+    paragraph_spacing: float = 0.0
+    font_file: Optional[str] = settings.BODY_FONT_FILE
+
+
+class TextFitter:
+    """Measures paragraphs against a TextBox; line counts are memoized per text."""
+
+    def __init__(self, box: TextBox) -> None:
+        self.box = box
+        self.metrics = get_metrics(box.font_file)
+        self.line_height = box.font_size * settings.LINE_SPACING
+        self._lines: Dict[str, int] = {}
+
+    def line_count(self, text: str) -> int:
+        count = self._lines.get(text)
+        if count is None:
+            if len(self._lines) >= _MEMO_LIMIT:
+                self._lines.clear()
+            count = self._lines[text] = len(self.metrics.wrap(text, self.box.font_size, self.box.width))
+        return count
+
+    def paragraph_height(self, text: str) -> float:
+        return (self.line_count(text) + self.box.paragraph_spacing) * self.line_height
+
+    def chunk_sizes(self, paragraphs: List[str], max_items: int) -> List[int]:
+        """Split paragraphs, in order, into runs that fit the box height; returns the run lengths.
+
+        A run never exceeds ``max_items`` paragraphs, and a paragraph too tall for an
+        empty box still gets a run of its own.
+        """
+        sizes: List[int] = []
+        count = 0
+        used = 0.0
+        for text in paragraphs:
+            height = self.paragraph_height(text)
+            if count and (used + height > self.box.height or count >= max_items):
+                sizes.append(count)
+                count, used = 0, 0.0
+            count += 1
+            used += height
+        if count:
+            sizes.append(count)
+        return sizes
+
+    def fits(self, paragraphs: List[str], max_items: int) -> bool:
+        """Whether the paragraphs fill a single run of chunk_sizes()."""
+        if len(paragraphs) <= 1:
+            return True
+        if len(paragraphs) > max_items:
+            return False
+        return sum(map(self.paragraph_height, paragraphs)) <= self.box.height
+
+    @classmethod
+    def for_placeholder(cls, master, layout_placeholder) -> "TextFitter":
+        """Fitter for a layout placeholder: its size less insets and indent, and its level-1 text style.
+
+        ``master`` is the python-pptx slide master the layout belongs to.
+        """
+        body_pr = layout_placeholder._element.find(f"{_P}txBody/{_A}bodyPr")
+        insets = [_emu_attribute(body_pr, name, default) for name, default in _INSETS]
+        styles = [
+            layout_placeholder._element.find(f"{_P}txBody/{_A}lstStyle/{_A}lvl1pPr"),
+            master._element.find(f"{_P}txStyles/{_P}bodyStyle/{_A}lvl1pPr"),
+        ]
+        size = _first(styles, f"{_A}defRPr", "sz")
+        margin = _first(styles, None, "marL")
+        spacing = _first(styles, f"{_A}spcBef/{_A}spcPct", "val")
+        typeface = _first(styles, f"{_A}defRPr/{_A}latin", "typeface")
+        font_file = settings.BODY_FONT_FILE
+        if typeface and not typeface.startswith("+") and ImageFont is not None:
+            # Theme fonts (+mn-lt) would need the theme part; explicit faces are tried as installed files.
+            if get_metrics(f"{typeface}.ttf").exact:
+                font_file = f"{typeface}.ttf"
+        box = TextBox(
+            width=max(1.0, (layout_placeholder.width - insets[0] - insets[1] - int(margin or 0)) / _EMU_PER_POINT),
+            height=max(1.0, (layout_placeholder.height - insets[2] - insets[3]) / _EMU_PER_POINT),
+            font_size=int(size) / 100 if size else settings.BODY_FONT_SIZE_PT,
+            paragraph_spacing=int(spacing) / 100000 if spacing else 0.0,
+            font_file=font_file,
+        )
+        return cls(box)
+
+
+def fitter_for_layout(template, layout) -> Optional[TextFitter]:
+    """Fitter for the body placeholder of a TemplateLayout in a LoadedTemplate, if it has one."""
+    placeholders = template.placeholder_map.get(layout.index, layout.placeholders)
+    # The placeholder SlideGenerator writes bullets into: the first body-role type in layout order.
+    accepted = settings.PLACEHOLDER_ROLES["body"]
+    idx = next((idx for kind, idx in placeholders.items() if kind in accepted), None)
+    if idx is None:
+        return None
+    slide_layout = template.layouts[layout.index]
+    placeholder = slide_layout.placeholders.get(idx=idx)
+    if placeholder is None:
+        return None
+    return TextFitter.for_placeholder(slide_layout.slide_master, placeholder)
+
+
+# bodyPr insets and their OOXML defaults in EMU: left, right, top, bottom
+_INSETS: Tuple[Tuple[str, int], ...] = (("lIns", 91440), ("rIns", 91440), ("tIns", 45720), ("bIns", 45720))
+
+
+def _emu_attribute(element, name: str, default: int) -> int:
+    value = element.get(name) if element is not None else None
+    return int(value) if value is not None else default
+
+
+def _first(styles, path: Optional[str], attribute: str) -> Optional[str]:
+    for style in styles:
+        if style is None:
+            continue
+        element = style.find(path) if path else style
+        if element is not None and element.get(attribute) is not None:
+            return element.get(attribute)
+    return None
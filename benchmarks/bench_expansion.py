@@ -0,0 +1,95 @@
+"""Bullet expansion throughput and latency against a simulated remote backend.
+
+Compares one request per bullet with batched, concurrent requests, then a warm
+run served from the memo cache. ``--http`` goes through the local stub server
+instead of the in-process fake. Run with ``python -m benchmarks.bench_expansion``.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import shutil
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from agents.expansion import AsyncBatchExpander, ExpansionMemo, FakeRemoteBackend, HttpBackend
+from tools.expansion_stub_server import make_server
+
+
+def synthetic_bullets(count: int, distinct: int) -> List[str]:
+    return [f"重點 {index % distinct} market signal {index % distinct}" for index in range(count)]
+
+
+def run_case(name: str, expander: AsyncBatchExpander, bullets: List[str]) -> Dict:
+    started = time.perf_counter()
+    expander.expand(bullets)
+    seconds = time.perf_counter() - started
+    stats = expander.stats()
+    return {
+        "case": name,
+        "bullets": len(bullets),
+        "seconds": round(seconds, 4),
+        "bullets_per_s": round(len(bullets) / seconds, 1) if seconds else None,
+        "requests": stats["requests"],
+        "p50_ms": round(stats["p50_seconds"] * 1000, 1),
+        "p95_ms": round(stats["p95_seconds"] * 1000, 1),
+    }
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--bullets", type=int, default=500)
+    parser.add_argument("--distinct", type=int, default=400, help="Distinct bullet texts among --bullets")
+    parser.add_argument("--latency", type=float, default=0.02, help="Simulated seconds per request")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--max-in-flight", type=int, default=4)
+    parser.add_argument("--http", action="store_true", help="Use the stub HTTP server instead of the in-process fake")
+    parser.add_argument("--json", action="store_true", help="Emit JSON instead of a table")
+    args = parser.parse_args(argv)
+
+    bullets = synthetic_bullets(args.bullets, args.distinct)
+    workdir = Path(tempfile.mkdtemp(prefix="bench-expansion-"))
+    server = None
+    if args.http:
+        server = make_server(latency=args.latency)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{server.server_address[1]}/expand"
+
+    def backend():
+        return HttpBackend(url) if args.http else FakeRemoteBackend(latency=args.latency, per_item=0.0)
+
+    try:
+        memo = ExpansionMemo(workdir / "memo.sqlite3")
+        rows = [
+            run_case("per-bullet", AsyncBatchExpander(backend(), batch_size=1, max_in_flight=1, lru_size=0), bullets),
+            run_case(
+                "batched",
+                AsyncBatchExpander(backend(), batch_size=args.batch_size, max_in_flight=args.max_in_flight, memo=memo),
+                bullets,
+            ),
+            run_case("memo-warm", AsyncBatchExpander(backend(), memo=memo), bullets),
+        ]
+        memo.close()
+    finally:
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.json:
+        print(json.dumps(rows, indent=2))
+        return 0
+    print(f"{'case':<12} {'bullets':>7} {'seconds':>8} {'bullets/s':>10} {'requests':>8} {'p50 ms':>7} {'p95 ms':>7}")
+    for row in rows:
+        print(
+            f"{row['case']:<12} {row['bullets']:>7} {row['seconds']:>8.3f} {row['bullets_per_s'] or 0:>10.1f} "
+            f"{row['requests']:>8} {row['p50_ms']:>7.1f} {row['p95_ms']:>7.1f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,154 @@
+"""Memory use and serialization speed of the slide models.
+
+Compares the previous ``__dict__`` dataclasses (pickled) with the slotted models,
+pickled and through core.codec, for a batch of plans and generated slides.
+"model MB" is the freshly built objects, "loaded MB" the same objects after a
+round trip. Run with ``python -m benchmarks.bench_models``.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import pickle
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from core import codec
+from core.models import GeneratedSlide, OutlineItem, SlidePlan, TemplateLayout
+
+
+@dataclass
+class LegacyLayout:
+    index: int
+    name: str
+    kind: str
+    placeholders: Dict[str, int]
+    is_common: bool
+
+
+@dataclass
+class LegacyItem:
+    title: str
+    bullets: List[str]
+    image_hint: Optional[str] = None
+
+
+@dataclass
+class LegacyPlan:
+    layout: LegacyLayout
+    outline: LegacyItem
+
+
+@dataclass
+class LegacySlide:
+    title: str
+    bullet_sentences: List[str]
+    outline: LegacyItem
+    image_path: Optional[Path] = None
+    notes: Dict[str, str] = field(default_factory=dict)
+
+
+def _texts(index: int, bullets: int):
+    title = f"Quarterly review section {index}"
+    points = [f"重點 {index % 50}-{number} market signal" for number in range(bullets)]
+    sentences = [f"{point}：聚焦此主題的關鍵重點。" for point in points]
+    image = Path("images") / f"{index % 200:064x}.png"
+    return title, points, sentences, image
+
+
+def build_legacy(slides: int, bullets: int):
+    layout = LegacyLayout(1, "Title and Content", "content", {"title": 0, "body": 1}, True)
+    plans, generated = [], []
+    for index in range(slides):
+        title, points, sentences, image = _texts(index, bullets)
+        item = LegacyItem(title=title, bullets=points)
+        plans.append(LegacyPlan(layout=layout, outline=item))
+        generated.append(LegacySlide(title=title, bullet_sentences=sentences, outline=item, image_path=image))
+    return plans, generated
+
+
+def build_slotted(slides: int, bullets: int):
+    layout = TemplateLayout(1, "Title and Content", "content", {"title": 0, "body": 1}, True)
+    plans, generated = [], []
+    for index in range(slides):
+        title, points, sentences, image = _texts(index, bullets)
+        item = OutlineItem(title=title, bullets=points)
+        plans.append(SlidePlan(layout=layout, outline=item))
+        generated.append(GeneratedSlide(bullet_sentences=sentences, outline=item, image_path=image))
+    return plans, generated
+
+
+def measure_memory(function: Callable, *args) -> int:
+    tracemalloc.start()
+    objects = function(*args)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del objects
+    return size
+
+
+def timed(function: Callable, rounds: int) -> float:
+    best = float("inf")
+    for _ in range(rounds):
+        started = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def run(slides: int, bullets: int, rounds: int) -> List[Dict]:
+    legacy = build_legacy(slides, bullets)
+    slotted = build_slotted(slides, bullets)
+    cases = {
+        "legacy+pickle": (build_legacy, legacy, pickle.dumps, pickle.loads),
+        "slots+pickle": (build_slotted, slotted, pickle.dumps, pickle.loads),
+        "slots+codec": (
+            build_slotted,
+            slotted,
+            lambda pair: (codec.encode_plans(pair[0]), codec.encode_slides(pair[1])),
+            lambda blobs: (codec.decode_plans(blobs[0]), codec.decode_slides(blobs[1])),
+        ),
+    }
+    rows = []
+    for name, (build, objects, dump, load) in cases.items():
+        payload = dump(objects)
+        size = len(payload) if isinstance(payload, bytes) else sum(map(len, payload))
+        rows.append(
+            {
+                "case": name,
+                "model_mb": round(measure_memory(build, slides, bullets) / 1e6, 2),
+                "loaded_mb": round(measure_memory(load, payload) / 1e6, 2),
+                "payload_mb": round(size / 1e6, 2),
+                "dump_ms": round(timed(lambda: dump(objects), rounds) * 1000, 1),
+                "load_ms": round(timed(lambda: load(payload), rounds) * 1000, 1),
+            }
+        )
+    return rows
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--slides", type=int, default=10_000)
+    parser.add_argument("--bullets", type=int, default=5)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--json", action="store_true", help="Emit JSON instead of a table")
+    args = parser.parse_args(argv)
+
+    rows = run(args.slides, args.bullets, args.rounds)
+    if args.json:
+        print(json.dumps(rows, indent=2))
+        return 0
+    print(f"{'case':<14} {'model MB':>9} {'loaded MB':>10} {'payload MB':>11} {'dump ms':>8} {'load ms':>8}")
+    for row in rows:
+        print(
+            f"{row['case']:<14} {row['model_mb']:>9.2f} {row['loaded_mb']:>10.2f} {row['payload_mb']:>11.2f} "
+            f"{row['dump_ms']:>8.1f} {row['load_ms']:>8.1f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,97 @@
+"""Decks per second when one template renders many outlines.
+
+Compares loading the template for every deck, checking out a fresh copy from
+TemplateRegistry, and render_decks() reusing one loaded template. Run with
+``python -m benchmarks.bench_multi_deck``.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from agents.outline_manager import OutlineParser
+from agents.pipeline import DeckRequest, render_deck, render_decks
+from agents.template_loader import TemplateRegistry, load_template
+from benchmarks.synthetic import build_outline, build_template
+
+
+def run(decks: int, slides: int, extra_layouts: int, media_slides: int) -> List[Dict]:
+    workdir = Path(tempfile.mkdtemp(prefix="bench-multi-deck-"))
+    template_path = build_template(workdir / "template.pptx", extra_layouts=extra_layouts, media_slides=media_slides)
+    requests = [
+        DeckRequest(OutlineParser.parse(build_outline(slides, seed=number)), output_name=f"deck{number}.pptx")
+        for number in range(decks)
+    ]
+
+    def reload_each(output_dir: Path) -> None:
+        for request in requests:
+            render_deck(
+                load_template(template_path),
+                request.outline_items,
+                output_dir=output_dir,
+                enable_images=False,
+                output_name=request.output_name,
+            )
+
+    def registry(output_dir: Path) -> None:
+        templates = TemplateRegistry()
+        for request in requests:
+            render_deck(
+                templates.checkout(template_path),
+                request.outline_items,
+                output_dir=output_dir,
+                enable_images=False,
+                output_name=request.output_name,
+            )
+
+    def shared(output_dir: Path) -> None:
+        for _ in render_decks(load_template(template_path), requests, output_dir=output_dir, enable_images=False):
+            pass
+
+    cases: Dict[str, Callable[[Path], None]] = {"reload-each": reload_each, "registry": registry, "shared": shared}
+    rows = []
+    try:
+        for name, function in cases.items():
+            started = time.perf_counter()
+            function(workdir / name)
+            seconds = time.perf_counter() - started
+            rows.append(
+                {
+                    "case": name,
+                    "decks": decks,
+                    "seconds": round(seconds, 3),
+                    "decks_per_s": round(decks / seconds, 1),
+                    "ms_per_deck": round(seconds / decks * 1000, 1),
+                }
+            )
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return rows
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--decks", type=int, default=100)
+    parser.add_argument("--slides", type=int, default=10, help="Outline entries per deck")
+    parser.add_argument("--extra-layouts", type=int, default=20, help="Cloned layouts to simulate a large template")
+    parser.add_argument("--media-slides", type=int, default=2, help="Example slides carrying large images")
+    parser.add_argument("--json", action="store_true", help="Emit JSON instead of a table")
+    args = parser.parse_args(argv)
+
+    rows = run(args.decks, args.slides, args.extra_layouts, args.media_slides)
+    if args.json:
+        print(json.dumps(rows, indent=2))
+        return 0
+    print(f"{'case':<12} {'decks':>6} {'seconds':>8} {'decks/s':>8} {'ms/deck':>8}")
+    for row in rows:
+        print(f"{row['case']:<12} {row['decks']:>6} {row['seconds']:>8.3f} {row['decks_per_s']:>8.1f} {row['ms_per_deck']:>8.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
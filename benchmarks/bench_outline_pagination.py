@@ -0,0 +1,127 @@
+"""Compare heap-based outline pagination against the original quadratic version.
+
+Run with ``python -m benchmarks.bench_outline_pagination``.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import time
+from typing import Dict, List
+
+from agents.outline_manager import OutlineManager
+from core.models import OutlineItem
+
+
+class LegacyOutlineManager(OutlineManager):
+    """The original list-rescanning implementation, kept as a reference."""
+
+    def _meet_page_target(self, items: List[OutlineItem], target_pages: int) -> List[OutlineItem]:
+        if target_pages <= 0:
+            return items
+        items = list(items)
+        while len(items) > target_pages and len(items) > 1:
+            merge_index = self._find_merge_index(items)
+            first = items.pop(merge_index)
+            second = items.pop(merge_index)
+            items.insert(
+                merge_index,
+                OutlineItem(
+                    title=f"{first.title} / {second.title}",
+                    bullets=first.bullets + second.bullets,
+                    image_hint=first.image_hint or second.image_hint,
+                ),
+            )
+        split_round = 1
+        while len(items) < target_pages and items:
+            idx = self._find_split_index(items)
+            outline = items.pop(idx)
+            first, second = self._split_outline(outline)
+            items.insert(idx, second)
+            items.insert(idx, first)
+            split_round += 1
+            if split_round > target_pages * 2:
+                break
+        return items
+
+    def _find_merge_index(self, items: List[OutlineItem]) -> int:
+        min_total = float("inf")
+        min_index = 0
+        for idx in range(len(items) - 1):
+            total = len(items[idx].bullets) + len(items[idx + 1].bullets)
+            if total < min_total:
+                min_total = total
+                min_index = idx
+        return min_index
+
+    def _find_split_index(self, items: List[OutlineItem]) -> int:
+        max_bullets = max(len(item.bullets) for item in items)
+        for idx, item in enumerate(items):
+            if len(item.bullets) == max_bullets:
+                return idx
+        return 0
+
+
+def synthetic_outline(size: int, seed: int = 7, max_bullets: int = 8) -> List[OutlineItem]:
+    rng = random.Random(seed)
+    return [
+        OutlineItem(
+            title=f"Topic {index}",
+            bullets=[f"point {index}.{bullet}" for bullet in range(rng.randint(1, max_bullets))],
+            image_hint=f"hint-{index}" if rng.random() < 0.2 else None,
+        )
+        for index in range(size)
+    ]
+
+
+def _time(manager: OutlineManager, items: List[OutlineItem], target: int) -> tuple:
+    started = time.perf_counter()
+    result = manager._meet_page_target(items, target)
+    return time.perf_counter() - started, result
+
+
+def run(sizes: List[int], legacy_max: int) -> List[Dict]:
+    rows: List[Dict] = []
+    for size in sizes:
+        items = synthetic_outline(size)
+        for mode, target in (("shrink", max(1, size // 25)), ("grow", size * 2)):
+            current_seconds, current = _time(OutlineManager(target_pages=target), items, target)
+            row = {"items": size, "mode": mode, "target": target, "heap_s": round(current_seconds, 6)}
+            if size <= legacy_max:
+                legacy_seconds, legacy = _time(LegacyOutlineManager(target_pages=target), items, target)
+                if legacy != current:
+                    raise AssertionError(f"Results differ for {size} items ({mode})")
+                row["legacy_s"] = round(legacy_seconds, 6)
+                row["speedup"] = round(legacy_seconds / current_seconds, 1) if current_seconds else None
+            rows.append(row)
+    return rows
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1_000, 5_000, 10_000, 100_000])
+    parser.add_argument(
+        "--legacy-max",
+        type=int,
+        default=5_000,
+        help="Largest outline to run through the quadratic reference implementation",
+    )
+    parser.add_argument("--json", action="store_true", help="Emit JSON instead of a table")
+    args = parser.parse_args(argv)
+
+    rows = run(args.sizes, args.legacy_max)
+    if args.json:
+        print(json.dumps(rows, indent=2))
+        return 0
+    print(f"{'items':>8} {'mode':>6} {'target':>8} {'heap (s)':>10} {'legacy (s)':>11} {'speedup':>8}")
+    for row in rows:
+        print(
+            f"{row['items']:>8} {row['mode']:>6} {row['target']:>8} {row['heap_s']:>10.4f} "
+            f"{row.get('legacy_s', float('nan')):>11.4f} {row.get('speedup') or '-':>8}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,86 @@
+"""Per-slide placeholder lookup cost: enum scanning versus the cached role map.
+
+Run with ``python -m benchmarks.bench_placeholder_lookup``.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from pptx import Presentation
+
+from agents.slide_generator import SlideGenerator
+from agents.template_loader import load_template
+from config import settings
+
+
+def legacy_get_placeholder(slide, accepted_types):
+    for placeholder in slide.placeholders:
+        placeholder_type = getattr(placeholder.placeholder_format.type, "name", "").lower()
+        if placeholder_type in accepted_types:
+            return placeholder
+    return None
+
+
+def run(slides: int, rounds: int) -> Dict:
+    workdir = Path(tempfile.mkdtemp(prefix="bench-placeholders-"))
+    template_path = workdir / "template.pptx"
+    Presentation().save(template_path)
+    template = load_template(template_path)
+    generator = SlideGenerator(template=template, output_dir=workdir)
+    layouts = template.summary.layouts
+    added = []
+    for index in range(slides):
+        layout = layouts[index % len(layouts)]
+        added.append((layout, generator.presentation.slides.add_slide(template.layouts[layout.index])))
+
+    def legacy() -> None:
+        for _, slide in added:
+            legacy_get_placeholder(slide, settings.PLACEHOLDER_ROLES["title"])
+            legacy_get_placeholder(slide, settings.PLACEHOLDER_ROLES["body"])
+
+    def cached() -> None:
+        for layout, slide in added:
+            roles = generator._roles_for(layout)
+            generator._get_placeholder(slide, roles, "title")
+            generator._get_placeholder(slide, roles, "body")
+
+    for layout, slide in added:
+        for role in ("title", "body"):
+            expected = legacy_get_placeholder(slide, settings.PLACEHOLDER_ROLES[role])
+            actual = generator._get_placeholder(slide, generator._roles_for(layout), role)
+            expected_element = expected.element if expected is not None else None
+            actual_element = actual.element if actual is not None else None
+            if expected_element is not actual_element:
+                raise AssertionError("Cached role lookup disagrees with the enum scan")
+
+    results = {}
+    for name, func in (("legacy", legacy), ("cached", cached)):
+        best = float("inf")
+        for _ in range(rounds):
+            started = time.perf_counter()
+            func()
+            best = min(best, time.perf_counter() - started)
+        results[f"{name}_us_per_slide"] = round(best / slides * 1e6, 2)
+    results["slides"] = slides
+    results["speedup"] = round(results["legacy_us_per_slide"] / results["cached_us_per_slide"], 1)
+    shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--slides", type=int, default=500)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args(argv)
+    print(json.dumps(run(args.slides, args.rounds), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
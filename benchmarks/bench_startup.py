@@ -0,0 +1,97 @@
+"""CLI startup cost: import time of each entry point and wall time of ``--help``.
+
+Import times come from ``python -X importtime``; the heavy-dependency column lists
+rendering libraries that were imported although no deck is rendered. Run with
+``python -m benchmarks.bench_startup``; exits non-zero when a path exceeds --budget-ms.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+ROOT = Path(__file__).resolve().parent.parent
+ENTRY_POINTS = ("ppt_agent", "ppt_batch", "tools.inspect_template")
+HEAVY_MODULES = ("pptx", "lxml", "PIL")
+
+
+def import_profile(module: str) -> Dict:
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    cumulative = 0
+    heavy = set()
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative_us, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        if not cumulative_us.isdigit():
+            continue  # header row
+        if name.split(".")[0] in HEAVY_MODULES:
+            heavy.add(name.split(".")[0])
+        if name == module:
+            cumulative = int(cumulative_us)
+    return {"import_ms": cumulative / 1000, "heavy": sorted(heavy)}
+
+
+def help_wall_ms(module: str) -> float:
+    started = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "-m", module, "--help"],
+        cwd=ROOT,
+        stdout=subprocess.DEVNULL,
+        check=True,
+    )
+    return (time.perf_counter() - started) * 1000
+
+
+def run(rounds: int) -> List[Dict]:
+    rows: List[Dict] = []
+    for module in ENTRY_POINTS:
+        profiles = [import_profile(module) for _ in range(rounds)]
+        rows.append(
+            {
+                "entry_point": module,
+                "import_ms": round(statistics.median(p["import_ms"] for p in profiles), 1),
+                "help_ms": round(statistics.median(help_wall_ms(module) for _ in range(rounds)), 1),
+                "heavy": profiles[0]["heavy"],
+            }
+        )
+    return rows
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=5, help="Runs per entry point; the median is reported")
+    parser.add_argument("--budget-ms", type=float, default=100.0, help="Fail when --help takes longer than this")
+    parser.add_argument("--json", action="store_true", help="Emit JSON instead of a table")
+    args = parser.parse_args(argv)
+
+    rows = run(max(1, args.rounds))
+    if args.json:
+        print(json.dumps(rows, indent=2))
+    else:
+        print(f"{'entry point':<24} {'import (ms)':>11} {'--help (ms)':>11}  heavy imports")
+        for row in rows:
+            print(
+                f"{row['entry_point']:<24} {row['import_ms']:>11.1f} {row['help_ms']:>11.1f}  "
+                f"{', '.join(row['heavy']) or '-'}"
+            )
+    over_budget = [row["entry_point"] for row in rows if row["help_ms"] > args.budget_ms]
+    if over_budget:
+        print(f"Over the {args.budget_ms:.0f} ms budget: {', '.join(over_budget)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
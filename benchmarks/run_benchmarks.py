@@ -0,0 +1,164 @@
+"""Reproducible end-to-end benchmark suite.
+
+Builds synthetic templates and outlines, runs ``ppt_agent.main`` with ``--profile``
+for every case and records per-stage and total wall times as JSON. Results can be
+compared against a saved baseline; any metric slower than the baseline by more than
+the threshold fails the run. Everything runs offline.
+
+    python -m benchmarks.run_benchmarks --output bench.json
+    python -m benchmarks.run_benchmarks --baseline bench.json --threshold 0.25
+"""
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import logging
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import pptx
+
+import ppt_agent
+from benchmarks.synthetic import build_outline, build_template
+from config import settings
+from core.logging import configure_logging
+
+TEMPLATES = {
+    "few-layouts": dict(extra_layouts=0),
+    "many-layouts": dict(extra_layouts=60),
+    "heavy-media": dict(media_slides=2, media_mb=4.0),
+}
+# Changes smaller than this are treated as noise when comparing against a baseline.
+MIN_DELTA_SECONDS = 0.005
+
+
+@dataclass
+class Case:
+    template: str
+    size: int
+    script: str
+    long_bullets: bool = False
+
+    @property
+    def name(self) -> str:
+        suffix = "-long" if self.long_bullets else ""
+        return f"{self.template}/{self.size}-{self.script}{suffix}"
+
+
+def build_cases(sizes: List[int], templates: List[str]) -> List[Case]:
+    cases: List[Case] = []
+    for template in templates:
+        for size in sizes:
+            cases.append(Case(template, size, "latin"))
+            cases.append(Case(template, size, "cjk"))
+        cases.append(Case(template, min(sizes), "cjk", long_bullets=True))
+    return cases
+
+
+def run_case(case: Case, template_path: Path, workdir: Path, repeat: int) -> Dict:
+    outline_path = workdir / f"{case.name.replace('/', '_')}.txt"
+    outline_path.write_text(
+        "\n".join(build_outline(case.size, script=case.script, long_bullets=case.long_bullets)),
+        encoding="utf-8",
+    )
+    best: Optional[Dict] = None
+    for _ in range(repeat):
+        output_dir = workdir / "out"
+        shutil.rmtree(output_dir, ignore_errors=True)
+        argv = [
+            "--template",
+            str(template_path),
+            "--outline-file",
+            str(outline_path),
+            "--output-dir",
+            str(output_dir),
+            "--no-cache",
+            "--profile",
+        ]
+        started = time.perf_counter()
+        with redirect_stdout(io.StringIO()):
+            ppt_agent.main(argv)
+        total = time.perf_counter() - started
+        profile = json.loads((output_dir / settings.PROFILE_NAME).read_text(encoding="utf-8"))
+        metrics = {stage["name"]: stage["wall_seconds"] for stage in profile["stages"]}
+        metrics["main"] = total
+        if best is None or total < best["main"]:
+            best = metrics
+    return {"case": case.name, "slides": case.size, "metrics": best}
+
+
+def compare(current: Dict, baseline: Dict, threshold: float) -> List[str]:
+    baseline_cases = {entry["case"]: entry["metrics"] for entry in baseline["cases"]}
+    regressions = []
+    for entry in current["cases"]:
+        previous = baseline_cases.get(entry["case"])
+        if previous is None:
+            continue
+        for metric, seconds in entry["metrics"].items():
+            before = previous.get(metric)
+            if before is None or seconds - before < MIN_DELTA_SECONDS:
+                continue
+            if seconds > before * (1 + threshold):
+                regressions.append(
+                    f"{entry['case']} {metric}: {before:.4f}s -> {seconds:.4f}s (+{(seconds / before - 1) * 100:.0f}%)"
+                )
+    return regressions
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Run the synthetic benchmark suite")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100], help="Outline sizes, e.g. 10 100 1000 10000")
+    parser.add_argument("--templates", nargs="+", choices=sorted(TEMPLATES), default=sorted(TEMPLATES))
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per case; the fastest is kept")
+    parser.add_argument("--output", type=Path, help="Write results JSON here")
+    parser.add_argument("--baseline", type=Path, help="Compare against a previously saved results JSON")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed slowdown ratio before failing")
+    args = parser.parse_args(argv)
+
+    configure_logging(logging.WARNING)
+    workdir = Path(tempfile.mkdtemp(prefix="ppt-bench-"))
+    try:
+        templates = {
+            name: build_template(workdir / f"{name}.pptx", **TEMPLATES[name]) for name in args.templates
+        }
+        results = {
+            "meta": {
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "python_pptx": pptx.__version__,
+            },
+            "cases": [],
+        }
+        for case in build_cases(args.sizes, args.templates):
+            entry = run_case(case, templates[case.template], workdir, max(1, args.repeat))
+            results["cases"].append(entry)
+            print(f"{case.name:<36} {entry['metrics']['main']:8.3f}s", file=sys.stderr)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2), encoding="utf-8")
+    else:
+        print(json.dumps(results, indent=2))
+
+    if args.baseline:
+        regressions = compare(results, json.loads(args.baseline.read_text(encoding="utf-8")), args.threshold)
+        if regressions:
+            print("Performance regressions:", file=sys.stderr)
+            for line in regressions:
+                print(f"  {line}", file=sys.stderr)
+            return 1
+        print("No regressions against baseline", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,106 @@
+"""Synthetic templates and outlines for offline benchmarking."""
+from __future__ import annotations
+
+import copy
+import math
+import random
+import zipfile
+from io import BytesIO
+from pathlib import Path
+from typing import List
+
+from pptx import Presentation
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+from pptx.opc.packuri import PackURI
+from pptx.parts.slide import SlideLayoutPart
+from pptx.util import Inches
+
+try:
+    from PIL import Image
+except ImportError:  # pragma: no cover - optional dependency
+    Image = None  # type: ignore
+
+LATIN_WORDS = (
+    "market growth automation data platform customer revenue margin pipeline quality "
+    "supply chain forecast insight strategy roadmap delivery adoption risk compliance"
+).split()
+
+
+def build_template(path: Path, extra_layouts: int = 0, media_slides: int = 0, media_mb: float = 4.0) -> Path:
+    """Write a template based on python-pptx's default one.
+
+    ``extra_layouts`` clones "Title and Content" under new names to simulate large
+    corporate templates; ``media_slides`` adds example slides carrying incompressible
+    images of roughly ``media_mb`` MB each. The same arguments always produce the
+    same bytes, so template hashes and cache hits are comparable between runs.
+    """
+    presentation = Presentation()
+    source = presentation.slide_layouts[1]
+    for number in range(extra_layouts):
+        _clone_layout(presentation, source, f"Custom Layout {number + 1}")
+    for number in range(media_slides):
+        slide = presentation.slides.add_slide(presentation.slide_layouts[6])
+        slide.shapes.add_picture(_noise_png(media_mb, seed=number), Inches(0), Inches(0), width=Inches(10))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    _save_reproducibly(presentation, path)
+    return path
+
+
+def build_outline(size: int, script: str = "latin", long_bullets: bool = False, seed: int = 11) -> List[str]:
+    """Return ``size`` outline entries in the CLI ``Title|b1,b2`` format."""
+    rng = random.Random(seed)
+    entries = []
+    for index in range(size):
+        bullet_count = rng.randint(2, 8)
+        length = rng.randint(60, 120) if long_bullets else rng.randint(6, 20)
+        bullets = [_text(rng, script, length) for _ in range(bullet_count)]
+        entries.append(f"{_text(rng, script, 12)} {index}|{','.join(bullets)}")
+    return entries
+
+
+def _text(rng: random.Random, script: str, length: int) -> str:
+    if script == "cjk":
+        return "".join(chr(rng.randint(0x4E00, 0x9FA5)) for _ in range(length))
+    words: List[str] = []
+    while sum(len(word) + 1 for word in words) < length:
+        words.append(rng.choice(LATIN_WORDS))
+    return " ".join(words)
+
+
+def _clone_layout(presentation, source, name: str) -> None:
+    master_part = presentation.slide_master.part
+    package = source.part.package
+    element = copy.deepcopy(source.part._element)
+    element.cSld.set("name", name)
+    partname = package.next_partname("/ppt/slideLayouts/slideLayout%d.xml")
+    part = SlideLayoutPart(PackURI(partname), source.part.content_type, package, element)
+    part.relate_to(master_part, RT.SLIDE_MASTER)
+    rId = master_part.relate_to(part, RT.SLIDE_LAYOUT)
+    id_list = presentation.slide_master._element.get_or_add_sldLayoutIdLst()
+    used_ids = [int(entry.get("id")) for entry in id_list.sldLayoutId_lst]
+    entry = id_list._add_sldLayoutId()
+    entry.set("id", str(max(used_ids) + 1))
+    entry.rId = rId
+
+
+def _save_reproducibly(presentation, path: Path) -> None:
+    # python-pptx stamps every zip entry with the current time; pin them instead.
+    buffer = BytesIO()
+    presentation.save(buffer)
+    with zipfile.ZipFile(buffer) as source, zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as target:
+        for info in source.infolist():
+            entry = zipfile.ZipInfo(info.filename, date_time=(1980, 1, 1, 0, 0, 0))
+            entry.compress_type = info.compress_type
+            target.writestr(entry, source.read(info.filename))
+
+
+def _noise_png(media_mb: float, seed: int) -> BytesIO:
+    if Image is None:
+        raise RuntimeError("Pillow is required to build media-heavy templates")
+    side = max(16, int(math.sqrt(media_mb * 1024 * 1024 / 3)))
+    # Seeded random bytes are as incompressible as os.urandom but identical between runs.
+    image = Image.frombytes("RGB", (side, side), random.Random(seed).randbytes(side * side * 3))
+    buffer = BytesIO()
+    image.save(buffer, format="PNG", compress_level=1)
+    buffer.seek(0)
+    return buffer
@@ -5,6 +5,9 @@ from pathlib import Path
 OUTPUT_DIR = Path("output")
 PRESENTATION_NAME = "output.pptx"
 IMAGES_DIR_NAME = "images"
+PROFILE_NAME = "profile.json"
+# Incremental runs keep per-slide fingerprints next to the deck, e.g. output.manifest.json
+DECK_MANIFEST_SUFFIX = ".manifest.json"
 # Layout heuristics
 COMMON_LAYOUT_ALIASES = {
     "title slide": "title",
@@ -16,11 +19,39 @@ COMMON_LAYOUT_ALIASES = {
     "two column": "content_two",
 }
 FALLBACK_LAYOUT_KEY = "title and content"
+# Use the two-content layout for slides with at least this many bullets (0 disables)
+TWO_CONTENT_MIN_BULLETS = 0
+
+# Placeholder types (lowercased PP_PLACEHOLDER names) that fill each slide role
+PLACEHOLDER_ROLES = {
+    "title": ("title", "centertitle"),
+    "body": ("body", "content", "object"),
+    "subtitle": ("subtitle",),
+    "picture": ("picture",),
+}
 
 # Generation defaults
 MAX_BULLETS_PER_SLIDE = 10
 SENTENCE_ENDINGS = ("。", ".", "!", "！", "?", "？")
 SUMMARY_SUFFIX = "："
+# Also split slides whose bullets would overflow the body placeholder, measured with the fonts below
+TEXT_FIT = True
+# Font used to measure body text when the template's font is not an installed file
+BODY_FONT_FILE = "DejaVuSans.ttf"
+# Body font size when neither the layout nor the master sets one
+BODY_FONT_SIZE_PT = 24
+# Line height as a multiple of the font size
+LINE_SPACING = 1.2
+
+# Bullet expansion backend: "rules" (built in), "fake" (simulated remote) or "http"
+EXPANSION_BACKEND = "rules"
+EXPANSION_BATCH_SIZE = 32
+EXPANSION_MAX_IN_FLIGHT = 4
+EXPANSION_RETRIES = 3
+EXPANSION_BACKOFF_SECONDS = 0.2
+EXPANSION_TIMEOUT_SECONDS = 10.0
+EXPANSION_LRU_SIZE = 4096
+EXPANSION_CACHE_DIR = Path(".cache") / "expansions"
 
 # Image generation
 IMAGE_WIDTH = 640
@@ -28,4 +59,19 @@ IMAGE_HEIGHT = 360
 BACKGROUND_COLOR = (245, 248, 252)
 TEXT_COLOR = (33, 37, 41)
 FONT_FALLBACK = "DejaVuSans-Bold.ttf"
+IMAGE_WORKERS = 4
+IMAGE_CACHE_DIR = Path(".cache") / "images"
+# Place slide images into the layout's picture placeholder instead of only listing them in the notes
+EMBED_IMAGES = False
+# Embedded images are downscaled to this resolution at the placeholder's size
+EMBED_IMAGE_DPI = 150
+
+# Template analysis cache
+TEMPLATE_CACHE_DIR = Path(".cache") / "templates"
+TEMPLATE_CACHE_MAX_ENTRIES = 64
+# Render from a pruned copy of the template: selectable layouts only, no example slides
+TEMPLATE_SKELETON = True
 
+# Batch rendering
+BATCH_WORKERS = 1
+BATCH_CHUNK_SIZE = 4
@@ -0,0 +1,226 @@
+"""Compact binary encoding of slide plans and generated slides.
+
+A payload is a header, one table of distinct strings and one flat array of
+unsigned 32-bit integers that index into it::
+
+    b"IPPT" | version u8 | kind u8 | u32 strings | u32 ints | u32 text bytes
+    | u32 string lengths | u32 ints | utf-8 text of every string, concatenated
+
+Each distinct string is stored once, so layout names, repeated bullets and note
+keys are shared by every object decoded from the same payload. Optional strings
+are stored as index + 1 with 0 meaning None.
+"""
+from __future__ import annotations
+
+import struct
+import sys
+from array import array
+from itertools import accumulate, islice
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, TypeVar
+
+from core.models import GeneratedSlide, OutlineItem, SlidePlan, TemplateLayout
+
+MAGIC = b"IPPT"
+VERSION = 1
+KIND_PLANS = 1
+KIND_SLIDES = 2
+
+_HEADER = struct.Struct("<4sBBIII")
+
+T = TypeVar("T")
+
+
+class CodecError(ValueError):
+    """The payload is truncated, from another version or of another kind."""
+
+
+class _Writer:
+    def __init__(self) -> None:
+        self.strings: Dict[str, int] = {}
+        self.ints = array("I")
+
+    def string(self, text: str) -> None:
+        index = self.strings.get(text)
+        if index is None:
+            index = self.strings[text] = len(self.strings)
+        self.ints.append(index)
+
+    def optional(self, text: Optional[str]) -> None:
+        if text is None:
+            self.ints.append(0)
+        else:
+            self.string(text)
+            self.ints[-1] += 1
+
+    def strings_list(self, texts: Sequence[str]) -> None:
+        self.ints.append(len(texts))
+        for text in texts:
+            self.string(text)
+
+    def outline(self, item: OutlineItem) -> None:
+        self.string(item.title)
+        self.optional(item.image_hint)
+        self.strings_list(item.bullets)
+
+    def finish(self, kind: int) -> bytes:
+        strings = list(self.strings)
+        lengths = array("I", map(len, strings))
+        text = "".join(strings).encode("utf-8")
+        ints = self.ints
+        if sys.byteorder == "big":
+            lengths.byteswap()
+            ints = array("I", ints)
+            ints.byteswap()
+        header = _HEADER.pack(MAGIC, VERSION, kind, len(strings), len(self.ints), len(text))
+        return b"".join((header, lengths.tobytes(), ints.tobytes(), text))
+
+
+class _Reader:
+    def __init__(self, data: bytes, kind: int) -> None:
+        if len(data) < _HEADER.size:
+            raise CodecError("Payload is too short")
+        magic, version, found_kind, string_count, int_count, text_size = _HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise CodecError(f"Unsupported payload (magic {magic!r}, version {version})")
+        if found_kind != kind:
+            raise CodecError(f"Expected payload kind {kind}, found {found_kind}")
+        offset = _HEADER.size
+        if len(data) != offset + 4 * (string_count + int_count) + text_size:
+            raise CodecError("Payload size does not match its header")
+        lengths = array("I", data[offset : offset + 4 * string_count])
+        offset += 4 * string_count
+        self.ints = array("I", data[offset : offset + 4 * int_count])
+        offset += 4 * int_count
+        if sys.byteorder == "big":
+            lengths.byteswap()
+            self.ints.byteswap()
+        try:
+            text = data[offset:].decode("utf-8")
+        except UnicodeDecodeError as exc:
+            raise CodecError(f"Payload text is not UTF-8: {exc}") from exc
+        ends = list(accumulate(lengths))
+        if (ends[-1] if ends else 0) != len(text):
+            raise CodecError("String lengths do not match the payload text")
+        self.strings = [text[end - length : end] for end, length in zip(ends, lengths)]
+        self._values = iter(self.ints.tolist())
+        self.number = self._values.__next__
+        self._paths: Dict[int, Path] = {}
+
+    def string(self) -> str:
+        return self.strings[self.number()]
+
+    def optional(self) -> Optional[str]:
+        index = self.number()
+        return self.strings[index - 1] if index else None
+
+    def optional_path(self) -> Optional[Path]:
+        index = self.number()
+        if not index:
+            return None
+        path = self._paths.get(index)
+        if path is None:
+            path = self._paths[index] = Path(self.strings[index - 1])
+        return path
+
+    def strings_list(self) -> List[str]:
+        count = self.number()
+        indexes = list(islice(self._values, count))
+        if len(indexes) != count:
+            raise CodecError("Payload is truncated")
+        return list(map(self.strings.__getitem__, indexes))
+
+    def outline(self) -> OutlineItem:
+        title = self.string()
+        image_hint = self.optional()
+        return OutlineItem(title=title, bullets=self.strings_list(), image_hint=image_hint)
+
+    def read(self, parse: Callable[["_Reader"], T]) -> T:
+        """Run ``parse`` over the whole payload, turning short or out-of-range data into CodecError."""
+        try:
+            result = parse(self)
+        except (StopIteration, IndexError) as exc:
+            raise CodecError("Payload is truncated or references a missing string") from exc
+        if next(self._values, None) is not None:
+            raise CodecError("Payload has trailing data")
+        return result
+
+
+def encode_plans(plans: Sequence[SlidePlan]) -> bytes:
+    """Encode plans; layouts are written once and referenced by position."""
+    writer = _Writer()
+    layouts: Dict[int, int] = {}
+    ordered: List[TemplateLayout] = []
+    for plan in plans:
+        if id(plan.layout) not in layouts:
+            layouts[id(plan.layout)] = len(ordered)
+            ordered.append(plan.layout)
+    writer.ints.append(len(ordered))
+    for layout in ordered:
+        writer.ints.extend((layout.index, int(layout.is_common), len(layout.placeholders)))
+        writer.string(layout.name)
+        writer.string(layout.kind)
+        for placeholder_type, idx in layout.placeholders.items():
+            writer.string(placeholder_type)
+            writer.ints.append(idx)
+    writer.ints.append(len(plans))
+    for plan in plans:
+        writer.ints.append(layouts[id(plan.layout)])
+        writer.outline(plan.outline)
+    return writer.finish(KIND_PLANS)
+
+
+def decode_plans(data: bytes) -> List[SlidePlan]:
+    return _Reader(data, KIND_PLANS).read(_read_plans)
+
+
+def _read_plans(reader: _Reader) -> List[SlidePlan]:
+    layouts = []
+    for _ in range(reader.number()):
+        index, is_common, placeholder_count = reader.number(), bool(reader.number()), reader.number()
+        name, kind = reader.string(), reader.string()
+        placeholders = {}
+        for _ in range(placeholder_count):
+            placeholder_type = reader.string()
+            placeholders[placeholder_type] = reader.number()
+        layouts.append(TemplateLayout(index, name, kind, placeholders, is_common))
+    return [SlidePlan(layout=layouts[reader.number()], outline=reader.outline()) for _ in range(reader.number())]
+
+
+def encode_slides(slides: Sequence[GeneratedSlide]) -> bytes:
+    writer = _Writer()
+    writer.ints.append(len(slides))
+    for slide in slides:
+        writer.outline(slide.outline)
+        writer.strings_list(slide.bullet_sentences)
+        writer.optional(str(slide.image_path) if slide.image_path is not None else None)
+        writer.ints.append(len(slide.notes))
+        for key, value in slide.notes.items():
+            writer.string(key)
+            writer.string(value)
+    return writer.finish(KIND_SLIDES)
+
+
+def decode_slides(data: bytes) -> List[GeneratedSlide]:
+    return _Reader(data, KIND_SLIDES).read(_read_slides)
+
+
+def _read_slides(reader: _Reader) -> List[GeneratedSlide]:
+    slides = []
+    for _ in range(reader.number()):
+        outline = reader.outline()
+        sentences = reader.strings_list()
+        image_path = reader.optional_path()
+        notes = {}
+        for _ in range(reader.number()):
+            key = reader.string()
+            notes[key] = reader.string()
+        slides.append(
+            GeneratedSlide(
+                bullet_sentences=sentences,
+                outline=outline,
+                image_path=image_path,
+                notes=notes,
+            )
+        )
+    return slides
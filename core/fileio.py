@@ -0,0 +1,35 @@
+"""File helpers for writes that other processes may observe concurrently."""
+from __future__ import annotations
+
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+
+@contextmanager
+def atomic_path(target: Path) -> Iterator[Path]:
+    """Yield a temporary path next to ``target`` that replaces it once the block succeeds.
+
+    Readers see either the previous file or the complete new one, never a partial
+    write; the temporary file is removed if the block raises.
+    """
+    target.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=target.parent, prefix=f".{target.name}.", suffix=".tmp")
+    os.close(fd)
+    tmp_path = Path(tmp_name)
+    try:
+        yield tmp_path
+        # mkstemp creates owner-only files; published artefacts should be world-readable.
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, target)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+def atomic_copy(source: Path, target: Path) -> None:
+    with atomic_path(target) as tmp_path:
+        shutil.copyfile(source, tmp_path)
@@ -4,6 +4,7 @@ from typing import Optional
 
 
 def configure_logging(level: int = logging.INFO) -> None:
+    """Install the CLI log format; call once from each entry point."""
     logging.basicConfig(
         level=level,
         format="[%(asctime)s] %(levelname)s %(name)s - %(message)s",
@@ -11,6 +12,4 @@ def configure_logging(level: int = logging.INFO) -> None:
 
 
 def get_logger(name: Optional[str] = None) -> logging.Logger:
-    configure_logging()
     return logging.getLogger(name if name else __name__)
-
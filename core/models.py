@@ -1,4 +1,4 @@
-"""Domain models shared across agent components."""
+"""Domain models shared across agent components; slotted to keep 10k-slide jobs small."""
 from __future__ import annotations
 
 from dataclasses import dataclass, field
@@ -6,7 +6,7 @@ from pathlib import Path
 from typing import Dict, List, Optional
 
 
-@dataclass
+@dataclass(slots=True)
 class TemplateLayout:
     index: int
     name: str
@@ -15,34 +15,36 @@ class TemplateLayout:
     is_common: bool
 
 
-@dataclass
+@dataclass(slots=True)
 class TemplateSummary:
     layouts: List[TemplateLayout]
 
 
-@dataclass
+@dataclass(slots=True)
 class OutlineItem:
     title: str
     bullets: List[str]
     image_hint: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class OutlineSummary:
     items: List[OutlineItem]
 
 
-@dataclass
+@dataclass(slots=True)
 class SlidePlan:
     layout: TemplateLayout
     outline: OutlineItem
 
 
-@dataclass
+@dataclass(slots=True)
 class GeneratedSlide:
-    title: str
     bullet_sentences: List[str]
     outline: OutlineItem
     image_path: Optional[Path] = None
     notes: Dict[str, str] = field(default_factory=dict)
 
+    @property
+    def title(self) -> str:
+        return self.outline.title
@@ -0,0 +1,220 @@
+"""Instrumentation helpers for measuring pipeline stages."""
+from __future__ import annotations
+
+import functools
+import json
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, TypeVar
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None  # type: ignore
+
+T = TypeVar("T")
+
+
+def peak_rss_mib() -> Optional[float]:
+    if resource is None:
+        return None
+    # ru_maxrss is reported in KiB on Linux.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+@dataclass
+class StageStats:
+    name: str
+    calls: int = 0
+    wall_seconds: float = 0.0
+    cpu_seconds: float = 0.0
+    items: int = 0
+    # How far the process peak RSS rose while the stage ran; None where it cannot be measured.
+    rss_growth_mib: Optional[float] = None
+
+    @property
+    def ms_per_item(self) -> Optional[float]:
+        return self.wall_seconds * 1000 / self.items if self.items else None
+
+
+class Profiler:
+    """Accumulates wall time, CPU time and peak RSS growth per named pipeline stage.
+
+    ``items`` counts what a stage processed (usually slides) for per-item averages.
+    The process peak RSS only ever rises, so each stage records how much it rose
+    while the stage ran; a stage that stayed below an earlier peak shows 0.
+    A disabled profiler records nothing, so instrumented code can always call it.
+    """
+
+    def __init__(self, enabled: bool = True) -> None:
+        self.enabled = enabled
+        self.stages: Dict[str, StageStats] = {}
+
+    @contextmanager
+    def stage(self, name: str, items: int = 0) -> Iterator[StageStats]:
+        stats = self.stages.get(name) or StageStats(name=name)
+        if not self.enabled:
+            yield stats
+            return
+        self.stages[name] = stats
+        rss_start = peak_rss_mib()
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield stats
+        finally:
+            rss_end = peak_rss_mib()
+            self.record(
+                name,
+                wall_seconds=time.perf_counter() - wall_start,
+                cpu_seconds=time.process_time() - cpu_start,
+                items=items,
+                rss_growth_mib=rss_end - rss_start if rss_end is not None else None,
+            )
+
+    def record(
+        self,
+        name: str,
+        wall_seconds: float,
+        cpu_seconds: float = 0.0,
+        items: int = 0,
+        rss_growth_mib: Optional[float] = None,
+    ) -> None:
+        if not self.enabled:
+            return
+        stats = self.stages.setdefault(name, StageStats(name=name))
+        stats.calls += 1
+        stats.wall_seconds += wall_seconds
+        stats.cpu_seconds += cpu_seconds
+        stats.items += items
+        if rss_growth_mib is not None:
+            stats.rss_growth_mib = (stats.rss_growth_mib or 0.0) + rss_growth_mib
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "stages": [
+                dict(asdict(stats), ms_per_item=stats.ms_per_item) for stats in self.stages.values()
+            ],
+            "peak_rss_mib": peak_rss_mib(),
+        }
+
+    def write_json(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.to_dict(), indent=2), encoding="utf-8")
+
+    def report(self) -> str:
+        header = f"{'stage':<24} {'calls':>5} {'wall (s)':>9} {'cpu (s)':>9} {'items':>6} {'ms/item':>8} {'RSS +':>9}"
+        lines = [header, "-" * len(header)]
+        for stats in self.stages.values():
+            per_item = f"{stats.ms_per_item:.2f}" if stats.ms_per_item is not None else "-"
+            rss = f"{stats.rss_growth_mib:.1f}M" if stats.rss_growth_mib is not None else "-"
+            lines.append(
+                f"{stats.name:<24} {stats.calls:>5} {stats.wall_seconds:>9.4f} {stats.cpu_seconds:>9.4f} "
+                f"{stats.items:>6} {per_item:>8} {rss:>9}"
+            )
+        peak = peak_rss_mib()
+        if peak is not None:
+            lines.append(f"RSS + is the rise in process peak RSS during the stage; process peak {peak:.1f}M")
+        return "\n".join(lines)
+
+
+_profiler = Profiler(enabled=False)
+
+
+def get_profiler() -> Profiler:
+    return _profiler
+
+
+def set_profiler(profiler: Profiler) -> Profiler:
+    global _profiler
+    previous, _profiler = _profiler, profiler
+    return previous
+
+
+def timed(name: str, items: Optional[Callable[[Any], int]] = None) -> Callable:
+    """Decorate a function so each call is recorded as stage ``name`` on the active profiler.
+
+    ``items`` derives the processed item count from the return value.
+    """
+
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            profiler = get_profiler()
+            if not profiler.enabled:
+                return func(*args, **kwargs)
+            with profiler.stage(name) as stats:
+                result = func(*args, **kwargs)
+                if items is not None:
+                    stats.items += items(result)
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+class StageMemory:
+    """Tracks the peak traced Python memory while each pipeline stage is running.
+
+    Streaming stages run nested inside each other's iteration, so a stage's peak
+    includes the upstream work it pulled in. Disabled meters are free no-ops.
+    """
+
+    def __init__(self, enabled: bool = True) -> None:
+        self.enabled = enabled
+        self.peaks: Dict[str, int] = {}
+        self._stack: List[List] = []
+        self._started_tracing = False
+
+    def start(self) -> None:
+        if self.enabled and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+
+    def stop(self) -> None:
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    @contextmanager
+    def measure(self, stage: str) -> Iterator[None]:
+        if not self.enabled or not tracemalloc.is_tracing():
+            yield
+            return
+        if self._stack:
+            parent = self._stack[-1]
+            parent[1] = max(parent[1], tracemalloc.get_traced_memory()[1])
+        frame = [stage, 0]
+        self._stack.append(frame)
+        tracemalloc.reset_peak()
+        try:
+            yield
+        finally:
+            peak = max(frame[1], tracemalloc.get_traced_memory()[1])
+            self._stack.pop()
+            self.peaks[stage] = max(self.peaks.get(stage, 0), peak)
+            if self._stack:
+                self._stack[-1][1] = max(self._stack[-1][1], peak)
+
+    def iter(self, stage: str, iterable: Iterable[T]) -> Iterator[T]:
+        if not self.enabled:
+            yield from iterable
+            return
+        iterator = iter(iterable)
+        while True:
+            with self.measure(stage):
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+            yield item
+
+    def report(self) -> str:
+        lines = ["Peak traced memory per stage:"]
+        for stage, peak in self.peaks.items():
+            lines.append(f"  {stage:<10} {peak / (1024 * 1024):8.2f} MiB")
+        return "\n".join(lines)
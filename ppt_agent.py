@@ -2,17 +2,17 @@
 from __future__ import annotations
 
 import argparse
+import itertools
 import sys
+from contextlib import ExitStack
 from pathlib import Path
 
-from agents.content_generator import ContentGenerator
-from agents.layout_matcher import LayoutMatcher
-from agents.outline_manager import OutlineManager, OutlineParser
-from agents.slide_generator import SlideGenerator
-from agents.template_analyzer import TemplateAnalyzer
 from config import settings
 from core.logging import configure_logging, get_logger
 
+# Agent modules pull in python-pptx and Pillow, so they are imported inside main()
+# once arguments are valid; --help and usage errors stay fast.
+
 logger = get_logger(__name__)
 
 
@@ -35,24 +35,116 @@ def build_arg_parser() -> argparse.ArgumentParser:
         default=0,
         help="Target number of slides (optional)",
     )
-    parser.add_argument(
+    outline_source = parser.add_mutually_exclusive_group(required=True)
+    outline_source.add_argument(
         "--outline",
         dest="outline_entries",
         action="append",
-        required=True,
         help="Outline entries formatted as 'Title|bullet1,bullet2[,|image:path]'",
     )
+    outline_source.add_argument(
+        "--outline-file",
+        help="File with one outline entry per line (CLI format or JSONL); '-' reads stdin",
+    )
     parser.add_argument(
         "--output-dir",
         type=Path,
         default=settings.OUTPUT_DIR,
         help="Directory to store generated artefacts",
     )
+    parser.add_argument(
+        "--output-name",
+        default=settings.PRESENTATION_NAME,
+        help="Deck file name; may use {title}, {hash} (outline digest) and {job}, e.g. '{title}-{hash}.pptx'",
+    )
+    parser.add_argument(
+        "--output",
+        help="Write the deck to this file instead of --output-dir/--output-name; '-' writes it to stdout",
+    )
+    parser.add_argument(
+        "--images-in-memory",
+        action="store_true",
+        help="Keep rendered images in memory instead of writing image files",
+    )
+    parser.add_argument(
+        "--job-id",
+        help="Value for {job} in --output-name (random when omitted)",
+    )
+    parser.add_argument(
+        "--expansion-backend",
+        choices=("rules", "fake", "http"),
+        default=settings.EXPANSION_BACKEND,
+        help="Bullet expansion backend: built-in rules, a simulated remote model, or an HTTP service",
+    )
+    parser.add_argument(
+        "--expansion-url",
+        help="Endpoint for --expansion-backend http (see tools/expansion_stub_server.py)",
+    )
     parser.add_argument(
         "--skip-images",
         action="store_true",
         help="Disable placeholder image generation",
     )
+    parser.add_argument(
+        "--embed-images",
+        action="store_true",
+        default=settings.EMBED_IMAGES,
+        help="Place images into the layouts' picture placeholders (one media part per distinct image)",
+    )
+    parser.add_argument(
+        "--defer-images",
+        action="store_true",
+        help="Render images in the background while slides are built",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Run layout matching, content expansion and slide insertion item by item",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Reuse unchanged slides and images from the previous deck in the output dir",
+    )
+    parser.add_argument(
+        "--memory-report",
+        action="store_true",
+        help="Report the peak traced memory of each pipeline stage",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help=(
+            "Print per-stage wall/CPU time and peak RSS growth, and write them to profile.json in the "
+            "output dir (or to --profile-json)"
+        ),
+    )
+    parser.add_argument(
+        "--profile-json",
+        type=Path,
+        help="Write the --profile JSON to this file; required to keep it when the deck goes to stdout",
+    )
+    parser.add_argument(
+        "--cprofile",
+        type=Path,
+        help="Dump cProfile statistics for the whole run to this pstats file",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        default=settings.TEMPLATE_CACHE_DIR,
+        help="Directory for cached template analyses",
+    )
+    parser.add_argument(
+        "--full-template",
+        action="store_true",
+        help="Render from the full template, keeping its example slides and unused layouts",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Disable the on-disk template analysis and image caches",
+    )
     return parser
 
 
@@ -64,38 +156,121 @@ def main(argv: list[str] | None = None) -> int:
     template_path: Path = args.template
     if not template_path.exists():
         parser.error(f"Template not found: {template_path}")
+    try:
+        args.output_name.format(title="", hash="", job="")
+    except (KeyError, IndexError, ValueError) as exc:
+        parser.error(f"Invalid --output-name {args.output_name!r}: {exc}")
+    output_stream = None
+    if args.output == "-":
+        if args.incremental:
+            parser.error("--incremental cannot write to stdout")
+        output_stream = sys.stdout.buffer
+    elif args.output:
+        args.output_dir, args.output_name = Path(args.output).parent, Path(args.output).name
+    if args.expansion_backend == "http" and not args.expansion_url:
+        parser.error("--expansion-backend http requires --expansion-url")
+    if args.incremental and args.images_in_memory:
+        parser.error("--incremental needs image files; drop --images-in-memory")
+    # The previous deck is found by name, so the name must not change between runs.
+    if args.incremental and "{hash}" in args.output_name:
+        parser.error("--incremental needs a stable --output-name; {hash} changes with the outline")
+    if args.incremental and "{job}" in args.output_name and not args.job_id:
+        parser.error("--incremental with {job} in --output-name requires --job-id")
+    # With the deck on stdout, every human-readable report goes to stderr.
+    report = sys.stderr if output_stream is not None else sys.stdout
 
-    outline_items = OutlineParser.parse(args.outline_entries)
-    if not outline_items:
-        parser.error("No valid outline entries provided")
-
-    target_pages = args.pages if args.pages > 0 else len(outline_items)
+    with ExitStack() as stack:
+        if args.outline_file is None:
+            raw_entries = args.outline_entries
+        elif args.outline_file == "-":
+            raw_entries = sys.stdin
+        else:
+            outline_path = Path(args.outline_file)
+            if not outline_path.exists():
+                parser.error(f"Outline file not found: {outline_path}")
+            raw_entries = stack.enter_context(open(outline_path, encoding="utf-8"))
 
-    logger.info("Starting AI PPT Agent")
-    template_summary = TemplateAnalyzer(template_path).analyze()
-    outline_summary = OutlineManager(target_pages=target_pages).organize(outline_items)
-    plans = LayoutMatcher(template_summary).match(outline_summary)
+        from agents.outline_manager import OutlineParser
+        from core.profiling import Profiler, StageMemory, set_profiler
 
-    output_dir: Path = args.output_dir
-    output_dir.mkdir(parents=True, exist_ok=True)
+        # Items are parsed lazily; peek once so an empty outline still fails fast.
+        outline_items = OutlineParser.iter_parse(raw_entries)
+        first_item = next(outline_items, None)
+        if first_item is None:
+            parser.error("No valid outline entries provided")
 
-    content_generator = ContentGenerator(output_dir=output_dir, enable_images=not args.skip_images)
-    generated_slides = content_generator.generate(plans)
+        logger.info("Starting AI PPT Agent")
+        profiler = Profiler(enabled=args.profile)
+        stack.callback(set_profiler, set_profiler(profiler))
+        memory = StageMemory(enabled=args.memory_report)
+        memory.start()
+        if args.cprofile:
+            import cProfile
 
-    slide_generator = SlideGenerator(
-        template_path=template_path,
-        template_summary=template_summary,
-        output_dir=output_dir,
-    )
-    if args.title:
-        slide_generator.presentation.core_properties.title = args.title
+            cprofiler = cProfile.Profile()
+            cprofiler.enable()
+            stack.callback(cprofiler.dump_stats, str(args.cprofile))
+            stack.callback(cprofiler.disable)
+        from agents.expansion import build_expander
+        from agents.pipeline import render_deck
+        from agents.template_cache import TemplateCache
+        from agents.template_loader import load_template
 
-    output_path = slide_generator.build(plans, generated_slides)
-    logger.info("Presentation ready: %s", output_path)
+        cache = None if args.no_cache else TemplateCache(args.cache_dir)
+        template = load_template(template_path, cache=cache, skeleton=not args.full_template)
+        expander = build_expander(
+            args.expansion_backend,
+            url=args.expansion_url,
+            memo_dir=None if args.no_cache else settings.EXPANSION_CACHE_DIR,
+        )
+        result = render_deck(
+            template,
+            itertools.chain([first_item], outline_items),
+            output_dir=args.output_dir,
+            output_name=args.output_name,
+            job_id=args.job_id,
+            title=args.title,
+            pages=args.pages,
+            enable_images=not args.skip_images,
+            image_cache_dir=None if args.no_cache else settings.IMAGE_CACHE_DIR,
+            defer_images=args.defer_images,
+            stream=args.stream,
+            memory=memory,
+            incremental=args.incremental,
+            output=output_stream,
+            images_in_memory=args.images_in_memory,
+            expander=expander,
+            embed_images=args.embed_images and not args.skip_images,
+        )
+        if expander is not None:
+            logger.info("Expansion stats: %s", expander.stats())
+            if expander.memo is not None:
+                expander.memo.close()
+        memory.stop()
+    if output_stream is not None:
+        output_stream.flush()
+    logger.info("Presentation ready: %s", result.output_path or "<stdout>")
+    if args.memory_report:
+        print(memory.report(), file=report)
+    if args.profile:
+        print(profiler.report(), file=report)
+        # A deck on stdout has no output dir to write next to.
+        profile_path = args.profile_json
+        if profile_path is None and output_stream is None:
+            profile_path = args.output_dir / settings.PROFILE_NAME
+        if profile_path is not None:
+            profiler.write_json(profile_path)
+            print("Profile written to:", profile_path, file=report)
+    if args.cprofile:
+        print("cProfile stats written to:", args.cprofile, file=report)
 
-    print("Generated presentation:", output_path)
-    if not args.skip_images and any(slide.image_path for slide in generated_slides):
-        print("Generated images in:", content_generator.images_dir)
+    print("Generated presentation:", result.output_path or "<stdout>", file=report)
+    if args.incremental:
+        print(f"Reused {result.reused_slides} slides, rebuilt {result.slide_count - result.reused_slides}", file=report)
+    if result.images_dir is not None:
+        print("Generated images in:", result.images_dir, file=report)
+    elif result.images:
+        print(f"Kept {len(result.images)} images in memory", file=report)
     return 0
 
 
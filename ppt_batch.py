@@ -0,0 +1,93 @@
+"""Batch entrypoint: render every deck of a JSONL manifest in one process."""
+from __future__ import annotations
+
+import argparse
+import sys
+from contextlib import ExitStack
+from pathlib import Path
+
+from config import settings
+from core.logging import configure_logging, get_logger
+
+logger = get_logger(__name__)
+
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="AI PPT Agent batch renderer")
+    parser.add_argument(
+        "--manifest",
+        required=True,
+        help="JSONL manifest of jobs ({template, title, pages, outline, output}); '-' reads stdin",
+    )
+    parser.add_argument(
+        "--results",
+        default="-",
+        help="Where to write per-job JSONL results; '-' writes to stdout",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        default=settings.TEMPLATE_CACHE_DIR,
+        help="Directory for cached template analyses",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Disable the on-disk template analysis and image caches",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=settings.BATCH_WORKERS,
+        help="Number of render processes; 1 renders in this process",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=settings.BATCH_CHUNK_SIZE,
+        help="Jobs sent to a worker per task when --workers > 1",
+    )
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    configure_logging()
+    parser = build_arg_parser()
+    args = parser.parse_args(argv)
+
+    with ExitStack() as stack:
+        if args.manifest == "-":
+            manifest = sys.stdin
+        else:
+            manifest_path = Path(args.manifest)
+            if not manifest_path.exists():
+                parser.error(f"Manifest not found: {manifest_path}")
+            manifest = stack.enter_context(open(manifest_path, encoding="utf-8"))
+        if args.results == "-":
+            results = sys.stdout
+        else:
+            results = stack.enter_context(open(args.results, "w", encoding="utf-8"))
+
+        # Imported late so --help and usage errors skip python-pptx and Pillow.
+        from agents.batch import BatchRunner, read_manifest
+        from agents.render_pool import RenderPool
+        from agents.template_cache import TemplateCache
+
+        image_cache_dir = None if args.no_cache else settings.IMAGE_CACHE_DIR
+        if args.workers > 1:
+            runner = RenderPool(
+                workers=args.workers,
+                chunk_size=args.chunk_size,
+                cache_dir=None if args.no_cache else args.cache_dir,
+                image_cache_dir=image_cache_dir,
+            )
+        else:
+            cache = None if args.no_cache else TemplateCache(args.cache_dir)
+            runner = BatchRunner(cache=cache, image_cache_dir=image_cache_dir)
+        report = runner.run(read_manifest(manifest), results=results)
+
+    return 0 if report.failed == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
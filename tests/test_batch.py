@@ -0,0 +1,40 @@
+import io
+import json
+from pathlib import Path
+
+from pptx import Presentation
+
+from agents.batch import BatchJob, BatchRunner, read_manifest
+from agents.render_pool import route_jobs
+
+
+def test_batch_runner_reports_each_job_and_keeps_going(tmp_path):
+    template = tmp_path / "template.pptx"
+    Presentation().save(template)
+    manifest = "\n".join(
+        [
+            json.dumps({"id": "ok", "template": str(template), "outline": ["A|a,b"], "output": str(tmp_path / "a.pptx")}),
+            json.dumps({"id": "missing", "template": str(tmp_path / "nope.pptx"), "outline": ["A|a"]}),
+            json.dumps({"id": "again", "template": str(template), "outline": ["B|b"], "output": str(tmp_path / "b.pptx"), "skip_images": True}),
+        ]
+    )
+    results = io.StringIO()
+
+    report = BatchRunner().run(read_manifest(io.StringIO(manifest)), results=results)
+
+    lines = [json.loads(line) for line in results.getvalue().splitlines()]
+    assert [line["status"] for line in lines] == ["ok", "error", "ok"]
+    assert report.succeeded == 2 and report.failed == 1
+    assert (tmp_path / "a.pptx").exists() and (tmp_path / "b.pptx").exists()
+
+
+def test_route_jobs_keeps_templates_together_and_balances_load(tmp_path):
+    def job(index, template):
+        return BatchJob(job_id=str(index), template=Path(template), outline=["A|a"], output=tmp_path / f"{index}.pptx")
+
+    jobs = [job(i, "a.pptx") for i in range(6)] + [job(i, "b.pptx") for i in range(6, 8)]
+    assignments = route_jobs(jobs, workers=2)
+
+    assert sorted(len(assigned) for assigned in assignments) == [4, 4]
+    templates_per_worker = [{j.template.name for j in assigned} for assigned in assignments]
+    assert sum(len(names) for names in templates_per_worker) == 3
@@ -0,0 +1,57 @@
+import struct
+from pathlib import Path
+
+import pytest
+
+from core import codec
+from core.models import GeneratedSlide, OutlineItem, SlidePlan, TemplateLayout
+
+
+def test_codec_round_trips_plans_and_slides_with_shared_values():
+    layout = TemplateLayout(1, "Title and Content", "content", {"title": 0, "body": 1}, True)
+    items = [
+        OutlineItem(title="市場", bullets=["a & b", "", "重點"], image_hint="trend.png"),
+        OutlineItem(title="Next", bullets=["重點"]),
+    ]
+    plans = [SlidePlan(layout=layout, outline=item) for item in items]
+    slides = [
+        GeneratedSlide(bullet_sentences=["a & b。", "重點。"], outline=items[0], image_path=Path("images/x.png")),
+        GeneratedSlide(bullet_sentences=[], outline=items[1], notes={"source": "outline"}),
+    ]
+
+    decoded_plans = codec.decode_plans(codec.encode_plans(plans))
+    decoded_slides = codec.decode_slides(codec.encode_slides(slides))
+
+    assert decoded_plans == plans and decoded_slides == slides
+    assert decoded_plans[0].layout is decoded_plans[1].layout
+    assert decoded_plans[0].outline.bullets[2] is decoded_plans[1].outline.bullets[0]
+    assert decoded_slides[1].title == "Next"
+
+
+def test_codec_rejects_foreign_payloads():
+    payload = codec.encode_slides([])
+    with pytest.raises(codec.CodecError):
+        codec.decode_plans(payload)
+    with pytest.raises(codec.CodecError):
+        codec.decode_slides(payload[:-1] + b"x" + b"y")
+    with pytest.raises(codec.CodecError):
+        codec.decode_slides(b"{}")
+
+
+def test_codec_reports_truncated_structures_as_codec_errors():
+    items = [OutlineItem(title="A", bullets=["a", "b"])]
+    payload = codec.encode_slides([GeneratedSlide(bullet_sentences=["a。"], outline=items[0])])
+    strings, ints, text = struct.unpack_from("<III", payload, 6)
+    header_size = codec._HEADER.size
+    ints_end = header_size + 4 * (strings + ints)
+    # Drop the last integer but keep the header self-consistent.
+    truncated = codec._HEADER.pack(codec.MAGIC, codec.VERSION, codec.KIND_SLIDES, strings, ints - 1, text)
+    truncated += payload[header_size : ints_end - 4] + payload[ints_end:]
+    with pytest.raises(codec.CodecError):
+        codec.decode_slides(truncated)
+
+    # An outline referencing a string the table does not have.
+    bad_index = bytearray(payload)
+    bad_index[header_size + 4 * strings + 4 : header_size + 4 * strings + 8] = (999).to_bytes(4, "little")
+    with pytest.raises(codec.CodecError):
+        codec.decode_slides(bytes(bad_index))
@@ -0,0 +1,96 @@
+import asyncio
+
+import pytest
+
+from agents.content_generator import ContentGenerator
+from agents.expansion import (
+    AsyncBatchExpander,
+    ExpansionBackend,
+    ExpansionError,
+    ExpansionMemo,
+    FakeRemoteBackend,
+    HttpBackend,
+    RuleBackend,
+    expand_rule,
+)
+from core.models import OutlineItem, SlidePlan, TemplateLayout
+
+
+def test_batched_expander_matches_rules_and_respects_limits(tmp_path):
+    bullets = [f"point {i % 30}" for i in range(100)] + ["", "  point   3 "]
+    backend = FakeRemoteBackend(latency=0.01, per_item=0.0)
+    memo = ExpansionMemo(tmp_path / "memo.sqlite3")
+    expander = AsyncBatchExpander(backend, batch_size=8, max_in_flight=2, memo=memo)
+
+    assert expander.expand(bullets) == [expand_rule(" ".join(b.split())) for b in bullets]
+    # 30 distinct non-empty bullets in batches of 8, never more than 2 in flight.
+    assert backend.calls == 4
+    assert backend.max_in_flight == 2
+
+    cold = AsyncBatchExpander(FakeRemoteBackend(latency=0.0), memo=memo)
+    assert cold.expand(bullets[:30]) == expander.expand(bullets[:30])
+    assert (cold.requests, cold.memo_hits) == (0, 30)
+    assert expander.lru_hits == 30
+    memo.close()
+
+
+def test_expander_retries_then_falls_back_to_rules():
+    class Flaky(ExpansionBackend):
+        name = "flaky"
+
+        def __init__(self, failures):
+            self.failures = failures
+            self.calls = 0
+
+        async def expand_batch(self, bullets):
+            self.calls += 1
+            if self.calls <= self.failures:
+                raise ExpansionError("down")
+            return [f"remote: {bullet}" for bullet in bullets]
+
+    recovering = AsyncBatchExpander(Flaky(failures=2), retries=2, backoff=0.0)
+    assert recovering.expand(["a", "b"]) == ["remote: a", "remote: b"]
+    assert (recovering.retried, recovering.fallbacks) == (2, 0)
+
+    broken = AsyncBatchExpander(Flaky(failures=10), retries=1, backoff=0.0)
+    assert broken.expand(["a"]) == [expand_rule("a")]
+    assert (broken.requests, broken.fallbacks) == (2, 1)
+    # Fallback sentences are not cached, so the next call asks the backend again.
+    broken.expand(["a"])
+    assert broken.requests == 4
+
+
+def test_expander_times_out_slow_calls():
+    expander = AsyncBatchExpander(FakeRemoteBackend(latency=1.0), retries=0, timeout=0.05)
+    assert expander.expand(["slow"]) == [expand_rule("slow")]
+    assert expander.fallbacks == 1
+
+
+def test_http_backends_for_different_urls_do_not_share_memo_keys():
+    first = AsyncBatchExpander(HttpBackend("http://one.invalid/expand"))
+    second = AsyncBatchExpander(HttpBackend("http://two.invalid/expand"))
+    assert first._memo_key("point") != second._memo_key("point")
+
+
+def test_expand_refuses_to_run_inside_an_event_loop():
+    expander = AsyncBatchExpander(RuleBackend())
+
+    async def nested():
+        with pytest.raises(RuntimeError):
+            expander.expand(["a"])
+        return await expander.expand_async(["a"])
+
+    assert asyncio.run(nested()) == [expand_rule("a")]
+
+
+def test_streamed_generation_batches_bullets_across_slides(tmp_path):
+    backend = FakeRemoteBackend(latency=0.0, per_item=0.0)
+    expander = AsyncBatchExpander(backend, batch_size=4, max_in_flight=1)
+    generator = ContentGenerator(tmp_path, enable_images=False, expander=expander)
+    layout = TemplateLayout(index=1, name="Title and Content", kind="content", placeholders={}, is_common=True)
+    plans = [SlidePlan(layout, OutlineItem(f"s{i}", [f"b{i}a", f"b{i}b"])) for i in range(5)]
+
+    streamed = [slide.bullet_sentences for _, slide in generator.iter_generate(plans)]
+    assert streamed == [[expand_rule(f"b{i}a"), expand_rule(f"b{i}b")] for i in range(5)]
+    # Ten bullets in windows of four: two full windows and the remainder, not one call per slide.
+    assert backend.calls == 3
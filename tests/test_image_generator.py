@@ -0,0 +1,58 @@
+import agents.image_generator as image_generator
+from agents.content_generator import ContentGenerator
+from agents.image_generator import ImageRenderer
+from core.models import OutlineItem, SlidePlan, TemplateLayout
+
+
+def test_image_renderer_renders_identical_placeholders_once(tmp_path):
+    cache_dir = tmp_path / "cache"
+    renderer = ImageRenderer(cache_dir=cache_dir, workers=2)
+    images_dir = tmp_path / "images"
+    first = renderer.submit(text="趨勢", title="市場", images_dir=images_dir)
+    second = renderer.submit(text="趨勢", title="市場", images_dir=images_dir)
+    other = renderer.submit(text="成本", title="市場", images_dir=images_dir)
+    paths = [handle.result() for handle in (first, second, other)]
+    renderer.close()
+
+    assert all(path.exists() for path in paths)
+    assert paths[0] == paths[1] != paths[2]
+    assert sorted(path.name for path in images_dir.iterdir()) == sorted({path.name for path in paths})
+    assert (renderer.rendered, renderer.reused) == (2, 1)
+
+    warm = ImageRenderer(cache_dir=cache_dir)
+    warm.submit(text="趨勢", title="市場", images_dir=tmp_path / "other").result()
+    warm.close()
+    assert warm.rendered == 0
+
+
+def test_deferred_images_return_paths_immediately_and_tolerate_failures(tmp_path, monkeypatch):
+    def broken(**kwargs):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(image_generator, "create_placeholder_image", broken)
+    layout = TemplateLayout(index=0, name="Title and Content", kind="content", placeholders={}, is_common=True)
+    plans = [SlidePlan(layout=layout, outline=OutlineItem(title="A", bullets=["a"]))]
+    generator = ContentGenerator(output_dir=tmp_path, image_cache_dir=None, defer_images=True)
+
+    slides = generator.generate(plans)
+    assert slides[0].image_path == tmp_path / "images" / f"{image_generator.image_key('a', 'A')}.png"
+
+    assert generator.wait_for_images() == 1
+    assert slides[0].image_path is None
+    assert slides[0].bullet_sentences
+
+
+def test_renderers_share_warm_worker_fonts_across_decks(tmp_path, monkeypatch):
+    loads = []
+    truetype = image_generator.ImageFont.truetype
+    monkeypatch.setattr(image_generator.ImageFont, "truetype", lambda *args: loads.append(args) or truetype(*args))
+
+    for deck in range(3):
+        if deck == 1:
+            loads.clear()
+        renderer = ImageRenderer(workers=1)
+        renderer.submit(text=f"deck {deck}", title="市場", images_dir=tmp_path / str(deck)).result()
+        renderer.close()
+
+    # Later decks run on the same worker thread and reuse the fonts it loaded.
+    assert loads == []
@@ -0,0 +1,38 @@
+from agents.layout_matcher import LayoutMatcher
+from config import settings
+from core.models import OutlineItem, OutlineSummary, TemplateLayout, TemplateSummary
+
+
+def _layout(index, name, kind):
+    return TemplateLayout(index=index, name=name, kind=kind, placeholders={}, is_common=kind != "other")
+
+
+def _summary():
+    return TemplateSummary(
+        layouts=[
+            _layout(0, "Title Slide", "title"),
+            _layout(1, "Title and Content", "content"),
+            _layout(2, "Two Content", "content_two"),
+            _layout(3, "Blank", "other"),
+        ]
+    )
+
+
+def test_layout_matcher_uses_title_then_content_layouts():
+    outline = OutlineSummary(items=[OutlineItem(title=str(i), bullets=["a"]) for i in range(3)])
+    plans = LayoutMatcher(_summary()).match(outline)
+    assert [plan.layout.index for plan in plans] == [0, 1, 1]
+
+
+def test_layout_matcher_falls_back_by_name_then_first_layout():
+    by_name = TemplateSummary(layouts=[_layout(0, "Blank", "other"), _layout(1, "TITLE AND CONTENT", "other")])
+    assert LayoutMatcher(by_name)._select_layout(1).index == 1
+    only_other = TemplateSummary(layouts=[_layout(0, "Blank", "other")])
+    assert LayoutMatcher(only_other)._select_layout(1).index == 0
+
+
+def test_layout_matcher_picks_two_content_by_bullet_count(monkeypatch):
+    monkeypatch.setattr(settings, "TWO_CONTENT_MIN_BULLETS", 4)
+    matcher = LayoutMatcher(_summary())
+    assert matcher._select_layout(1, OutlineItem(title="x", bullets=["a"] * 4)).index == 2
+    assert matcher._select_layout(1, OutlineItem(title="x", bullets=["a"] * 3)).index == 1
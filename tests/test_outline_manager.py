@@ -1,4 +1,19 @@
+import random
+
 from agents.outline_manager import OutlineManager, OutlineParser
+from core.models import OutlineItem
+
+
+def _synthetic_outline(size, seed, max_bullets):
+    rng = random.Random(seed)
+    return [
+        OutlineItem(
+            title=f"Topic {index}",
+            bullets=[f"point {index}.{bullet}" for bullet in range(rng.randint(1, max_bullets))],
+            image_hint=f"hint-{index}" if rng.random() < 0.2 else None,
+        )
+        for index in range(size)
+    ]
 
 
 def test_outline_parser_handles_image_hint():
@@ -20,3 +35,75 @@ def test_outline_manager_splits_to_target_pages():
     assert titles[0].startswith("主題A")
     assert any("Part 2" in title for title in titles)
 
+
+def _reference_page_target(items, target_pages):
+    """The original list-rescanning pagination: merge the smallest adjacent pair, split the largest item."""
+    items = list(items)
+    while len(items) > target_pages and len(items) > 1:
+        totals = [len(items[i].bullets) + len(items[i + 1].bullets) for i in range(len(items) - 1)]
+        index = totals.index(min(totals))
+        first, second = items.pop(index), items.pop(index)
+        items.insert(
+            index,
+            OutlineItem(
+                title=f"{first.title} / {second.title}",
+                bullets=first.bullets + second.bullets,
+                image_hint=first.image_hint or second.image_hint,
+            ),
+        )
+    split_round = 1
+    while len(items) < target_pages and items:
+        sizes = [len(item.bullets) for item in items]
+        index = sizes.index(max(sizes))
+        items[index : index + 1] = OutlineManager(target_pages)._split_outline(items[index])
+        split_round += 1
+        if split_round > target_pages * 2:
+            break
+    return items
+
+
+def test_page_target_matches_reference_implementation():
+    rng = random.Random(3)
+    for seed in range(40):
+        items = _synthetic_outline(rng.randint(1, 60), seed=seed, max_bullets=rng.choice([1, 3, 12]))
+        for target in (1, len(items) // 2 or 1, len(items), len(items) + 7, len(items) * 3):
+            actual = OutlineManager(target_pages=target)._meet_page_target(items, target)
+            assert actual == _reference_page_target(items, target)
+
+
+def test_outline_manager_merges_smallest_adjacent_pair_first():
+    items = OutlineParser.parse(["A|a1,a2,a3", "B|b1", "C|c1", "D|d1,d2"])
+    summary = OutlineManager(target_pages=3).organize(items)
+    assert [item.title for item in summary.items] == ["A", "B / C", "D"]
+
+
+def test_outline_parser_streams_mixed_line_and_json_entries():
+    lines = iter([
+        "市場趨勢|數位轉型,自動化需求|image:trend.png\n",
+        '{"title": "導入步驟", "bullets": ["需求盤點", "PoC"], "image": "steps.png"}\n',
+        "\n",
+        '{"title": "truncated\n',
+        "{Roadmap} 2027|a,b\n",
+    ])
+    stream = OutlineParser.iter_parse(lines)
+    first = next(stream)
+    assert first.title == "市場趨勢" and first.image_hint == "trend.png"
+    rest = list(stream)
+    assert [(item.title, item.bullets, item.image_hint) for item in rest] == [
+        ("導入步驟", ["需求盤點", "PoC"], "steps.png"),
+        ("{Roadmap} 2027", ["a", "b"], None),
+    ]
+
+
+def test_json_outline_entries_coerce_image_hints_to_text():
+    item = OutlineParser.parse_entry('{"title": "Numbers", "bullets": ["a"], "image": 5}')
+    assert item.image_hint == "5"
+
+
+def test_outline_manager_defaults_target_to_streamed_item_count():
+    items = OutlineParser.iter_parse(["A|a", "B|b", "C|c"])
+    manager = OutlineManager(target_pages=None)
+    assert [item.title for item in manager.organize(items).items] == ["A", "B", "C"]
+    # A reused manager targets each outline's own length.
+    summary = manager.organize(OutlineParser.parse(["D|d", "E|e"]))
+    assert [item.title for item in summary.items] == ["D", "E"]
@@ -0,0 +1,242 @@
+import copy
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from PIL import Image
+from pptx import Presentation
+from pptx.shapes.placeholder import PlaceholderPicture
+import pytest
+
+import agents.image_generator as image_generator
+from agents.outline_manager import OutlineParser
+from agents.pipeline import DeckRequest, render_deck, render_decks
+from agents.template_loader import load_template
+from config import settings
+from core.profiling import Profiler, StageMemory, set_profiler
+
+
+@pytest.fixture
+def template_path(tmp_path):
+    """python-pptx's default template on disk; load it once per render, as rendering adds slides to it."""
+    path = tmp_path / "template.pptx"
+    Presentation().save(path)
+    return path
+
+
+def _slide_texts(path):
+    return [
+        [shape.text_frame.text for shape in slide.shapes if shape.has_text_frame]
+        + [slide.notes_slide.notes_text_frame.text]
+        for slide in Presentation(path).slides
+    ]
+
+
+def test_streaming_pipeline_matches_buffered_pipeline(tmp_path, template_path):
+    entries = [f"Topic {i}|a{i},b{i},c{i}" for i in range(12)]
+
+    buffered = render_deck(
+        load_template(template_path),
+        OutlineParser.parse(entries),
+        output_dir=tmp_path / "buffered",
+        pages=8,
+        enable_images=False,
+    )
+    memory = StageMemory()
+    memory.start()
+    streamed = render_deck(
+        load_template(template_path),
+        OutlineParser.iter_parse(entries),
+        output_dir=tmp_path / "streamed",
+        pages=8,
+        enable_images=False,
+        stream=True,
+        memory=memory,
+    )
+    memory.stop()
+
+    assert streamed.slide_count == buffered.slide_count == 8
+    assert _slide_texts(streamed.output_path) == _slide_texts(buffered.output_path)
+    assert set(memory.peaks) == {"outline", "layout", "content", "slides", "save"}
+
+
+def test_profiler_records_pipeline_stages(tmp_path, template_path):
+    profiler = Profiler()
+    previous = set_profiler(profiler)
+    try:
+        render_deck(
+            load_template(template_path),
+            OutlineParser.parse(["A|a,b", "B|c"]),
+            output_dir=tmp_path / "out",
+            image_cache_dir=None,
+        )
+    finally:
+        set_profiler(previous)
+
+    stages = profiler.to_dict()["stages"]
+    by_name = {stage["name"]: stage for stage in stages}
+    stage_names = (
+        "template.load",
+        "template.analyze",
+        "outline.organize",
+        "layout.match",
+        "slides.build",
+        "content.images.wait",
+        "presentation.save",
+    )
+    for name in stage_names:
+        assert by_name[name]["calls"] == 1
+    assert by_name["slides.build"]["items"] == 2
+    assert by_name["content.text"]["items"] == 2
+    # Stages report how much they raised the process peak, not the peak itself.
+    assert all(stage["rss_growth_mib"] is None or stage["rss_growth_mib"] >= 0 for stage in stages)
+
+
+def test_incremental_render_rebuilds_only_changed_slides(tmp_path, template_path):
+    entries = [f"Topic {i}|a{i},b{i}" for i in range(6)]
+
+    def render(raw_entries):
+        return render_deck(
+            load_template(template_path),
+            OutlineParser.parse(raw_entries),
+            output_dir=tmp_path / "out",
+            enable_images=False,
+            incremental=True,
+        )
+
+    first = render(entries)
+    assert (first.reused_slides, first.slide_count) == (0, 6)
+    assert render(entries).reused_slides == 6
+
+    entries[3] = "Edited|x,y"
+    edited = render(entries)
+    assert (edited.reused_slides, edited.slide_count) == (5, 6)
+    titles = [texts[0] for texts in _slide_texts(edited.output_path)]
+    assert titles[1:] == ["Topic 1", "Topic 2", "Edited", "Topic 4", "Topic 5"]
+
+    shorter = render(entries[:4])
+    assert (shorter.reused_slides, shorter.slide_count) == (4, 4)
+    assert len(_slide_texts(shorter.output_path)) == 4
+
+    inserted = render(entries[:1] + ["New|n"] + entries[1:4])
+    assert (inserted.reused_slides, inserted.slide_count) == (4, 5)
+    titles = [texts[0] for texts in _slide_texts(inserted.output_path)]
+    assert titles[1:] == ["New", "Topic 1", "Topic 2", "Edited"]
+
+
+def test_output_name_patterns_keep_concurrent_jobs_apart(tmp_path, template_path):
+    output_dir = tmp_path / "shared"
+
+    def render(job_id):
+        return render_deck(
+            load_template(template_path),
+            OutlineParser.parse([f"Job {job_id}|a,b", "Common|c"]),
+            output_dir=output_dir,
+            title="Q3 Review: 市場/成本",
+            output_name="{title}-{job}-{hash}.pptx",
+            image_cache_dir=None,
+            job_id=job_id,
+        )
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(render, ["a", "b", "c", "d"]))
+
+    names = sorted(result.output_path.name for result in results)
+    assert len(set(names)) == 4
+    assert all(name.startswith("Q3-Review-市場-成本-") for name in names)
+    # The shared "Common" image is stored once, and no temporary files are left behind.
+    assert sorted(path.name for path in output_dir.iterdir()) == sorted(names + ["images"])
+    assert len(list((output_dir / "images").iterdir())) == 5
+
+
+def test_render_to_stream_with_in_memory_images_writes_nothing(tmp_path, template_path):
+    output_dir = tmp_path / "out"
+    buffer = BytesIO()
+
+    result = render_deck(
+        load_template(template_path),
+        OutlineParser.parse(["A|a,b", "B|c", "A|a,b"]),
+        output_dir=output_dir,
+        image_cache_dir=tmp_path / "cache",
+        output=buffer,
+        images_in_memory=True,
+    )
+
+    assert result.output_path is None and result.images_dir is None
+    assert not output_dir.exists() and not (tmp_path / "cache").exists()
+    assert len(Presentation(BytesIO(buffer.getvalue())).slides) == 3
+    assert result.image_count == 3
+    assert len(result.images) == 2 and all(data.startswith(b"\x89PNG") for data in result.images.values())
+
+
+def test_render_decks_reuses_one_template_without_leaking_slides(tmp_path, template_path):
+    outlines = [[f"Customer {n}|a{i},b{i}" for i in range(3 + n)] for n in range(3)]
+    requests = [
+        DeckRequest(OutlineParser.parse(outline), output_name=f"deck{n}.pptx", title=f"Deck {n}")
+        for n, outline in enumerate(outlines)
+    ]
+
+    template = load_template(template_path)
+    shared = list(render_decks(template, requests, output_dir=tmp_path / "shared", enable_images=False))
+    fresh = render_deck(
+        load_template(template_path),
+        requests[2].outline_items,
+        output_dir=tmp_path / "fresh",
+        title="Deck 2",
+        enable_images=False,
+        output_name="deck2.pptx",
+    )
+
+    assert [deck.slide_count for deck in shared] == [3, 4, 5]
+    assert len(template.presentation.slides) == 0
+    with zipfile.ZipFile(shared[2].output_path) as left, zipfile.ZipFile(fresh.output_path) as right:
+        assert sorted(left.namelist()) == sorted(right.namelist())
+        for name in left.namelist():
+            assert left.read(name) == right.read(name), name
+
+
+def test_embedded_images_share_media_parts_and_fit_placeholders(tmp_path, monkeypatch):
+    template_path = tmp_path / "template.pptx"
+    prs = Presentation()
+    picture = copy.deepcopy(prs.slide_layouts[8].placeholders[1]._element)
+    picture.xpath("./*[1]/p:nvPr/p:ph")[0].set("idx", "20")
+    prs.slide_layouts[1].shapes._spTree.append(picture)
+    prs.save(template_path)
+    monkeypatch.setattr(settings, "EMBED_IMAGE_DPI", 30)
+
+    deck = render_deck(
+        load_template(template_path),
+        OutlineParser.parse(["Cover|intro", "Same|a,b", "Same|a,c", "Other|d"]),
+        output_dir=tmp_path / "out",
+        image_cache_dir=None,
+        embed_images=True,
+    )
+
+    slides = Presentation(deck.output_path).slides
+    pictures = [shape for slide in slides for shape in slide.placeholders if isinstance(shape, PlaceholderPicture)]
+    assert len(pictures) == 3  # the cover uses the title layout, which has no picture placeholder
+    with zipfile.ZipFile(deck.output_path) as package:
+        media = [name for name in package.namelist() if name.startswith("ppt/media/")]
+        assert len(media) == 2
+        for name in media:
+            assert Image.open(BytesIO(package.read(name))).width < settings.IMAGE_WIDTH
+
+
+def test_failed_images_leave_no_image_note_and_are_counted(tmp_path, template_path, monkeypatch, caplog):
+    def broken(**kwargs):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(image_generator, "create_placeholder_image", broken)
+    modes = {"eager": {}, "deferred": {"defer_images": True}, "streamed": {"stream": True}}
+    for name, options in modes.items():
+        caplog.clear()
+        deck = render_deck(
+            load_template(template_path),
+            OutlineParser.parse(["A|a", "B|b"]),
+            output_dir=tmp_path / name,
+            image_cache_dir=None,
+            **options,
+        )
+        notes = [slide.notes_slide.notes_text_frame.text for slide in Presentation(deck.output_path).slides]
+        assert notes == ["Outline: A", "Outline: B"], name
+        assert "2 images failed" in caplog.text, name
@@ -0,0 +1,33 @@
+from lxml import etree
+from pptx import Presentation
+
+from agents.slide_generator import _write_paragraphs_slow, write_paragraphs
+
+CASES = [
+    [],
+    [""],
+    ["only"],
+    ["first & <x>", "", "第二點：重點。", "  spaced  ", 'quote "q" \'s\''],
+    ["line\nbreak", "tab\there", "vertical\vtab"],
+]
+
+
+def _canonical(text_frame):
+    return etree.tostring(text_frame._txBody, method="c14n")
+
+
+def test_bulk_paragraphs_match_python_pptx_xml():
+    presentation = Presentation()
+    layout = presentation.slide_layouts[1]
+    for lines in CASES:
+        for level_props in (False, True):
+            frames = []
+            for writer in (write_paragraphs, _write_paragraphs_slow):
+                slide = presentation.slides.add_slide(layout)
+                body = slide.placeholders[1].text_frame
+                body.text = "template text"
+                writer(body, lines, level_props=level_props)
+                notes = slide.notes_slide.notes_text_frame
+                writer(notes, lines)
+                frames.append((_canonical(body), _canonical(notes)))
+            assert frames[0] == frames[1], (lines, level_props)
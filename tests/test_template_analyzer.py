@@ -0,0 +1,48 @@
+import copy
+from io import BytesIO
+
+from PIL import Image
+from pptx import Presentation
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+from pptx.opc.packuri import PackURI
+from pptx.parts.slide import SlideLayoutPart
+from pptx.util import Inches
+
+from agents.template_analyzer import TemplateAnalyzer
+
+
+def _add_layout_copy(prs, source, name):
+    master_part = prs.slide_master.part
+    element = copy.deepcopy(source.part._element)
+    element.cSld.set("name", name)
+    partname = source.part.package.next_partname("/ppt/slideLayouts/slideLayout%d.xml")
+    part = SlideLayoutPart(PackURI(partname), source.part.content_type, source.part.package, element)
+    part.relate_to(master_part, RT.SLIDE_MASTER)
+    id_list = prs.slide_master._element.get_or_add_sldLayoutIdLst()
+    next_id = max(int(item.get("id")) for item in id_list.sldLayoutId_lst) + 1
+    entry = id_list._add_sldLayoutId()
+    entry.set("id", str(next_id))
+    entry.rId = master_part.relate_to(part, RT.SLIDE_LAYOUT)
+
+
+def test_fast_analysis_matches_python_pptx(tmp_path):
+    template = tmp_path / "template.pptx"
+    prs = Presentation()
+    for number in (1, 2):
+        _add_layout_copy(prs, prs.slide_layouts[1], f"Custom Layout {number}")
+    picture = BytesIO()
+    Image.new("RGB", (64, 64)).save(picture, format="PNG")
+    prs.slides.add_slide(prs.slide_layouts[6]).shapes.add_picture(picture, Inches(0), Inches(0))
+    layout = prs.slide_layouts[1]
+    del layout._element.cSld.attrib["name"]  # unnamed layouts fall back to "Layout N"
+    ph = prs.slide_layouts[0].placeholders[1]._element.xpath("./*[1]/p:nvPr/p:ph")[0]
+    del ph.attrib["type"]  # a missing type means "obj"
+    group = layout.shapes._spTree.add_grpSp()
+    group.append(copy.deepcopy(layout.placeholders[0]._element))  # nested placeholders are ignored
+    prs.save(template)
+
+    fast = TemplateAnalyzer(template, fast=True).analyze()
+    assert fast == TemplateAnalyzer(template).analyze()
+    assert fast.layouts[1].name == "Layout 1"
+    assert fast.layouts[0].placeholders["object"] == 1
+    assert len(fast.layouts) == 13
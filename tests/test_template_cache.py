@@ -0,0 +1,77 @@
+from pptx import Presentation
+
+from agents.layout_matcher import LayoutMatcher
+from agents.template_analyzer import TemplateAnalyzer
+from agents.template_cache import TemplateCache
+from agents.template_loader import load_template
+from config import settings
+from core.models import OutlineItem
+
+
+def _make_template(path):
+    Presentation().save(path)
+    return path
+
+
+def test_template_cache_round_trip_and_counters(tmp_path):
+    template = _make_template(tmp_path / "template.pptx")
+    cache = TemplateCache(tmp_path / "cache")
+
+    first = cache.get_or_analyze(template)
+    second = cache.get_or_analyze(template)
+
+    assert first == second == TemplateAnalyzer(template).analyze()
+    assert cache.stats() == {"hits": 1, "misses": 1, "entries": 1}
+    assert cache.invalidate(template)
+    assert cache.get(template) is None
+
+
+def test_template_cache_evicts_oldest_entries(tmp_path):
+    cache = TemplateCache(tmp_path / "cache", max_entries=1)
+    first = _make_template(tmp_path / "a.pptx")
+    second = tmp_path / "b.pptx"
+    prs = Presentation()
+    prs.core_properties.title = "different bytes"
+    prs.save(second)
+
+    cache.get_or_analyze(first)
+    cache.get_or_analyze(second)
+
+    assert cache.stats()["entries"] == 1
+    assert cache.get(first) is None
+    assert cache.get(second) is not None
+
+
+def test_skeleton_template_keeps_only_selectable_layouts(tmp_path):
+    template = tmp_path / "template.pptx"
+    prs = Presentation()
+    prs.slides.add_slide(prs.slide_layouts[6])  # example slide that must not reach the output
+    prs.save(template)
+    cache = TemplateCache(tmp_path / "cache")
+
+    full = load_template(template, skeleton=False)
+    compiled = load_template(template, cache=cache)
+    warm = load_template(template, cache=cache)
+
+    assert cache.skeleton_path(template).exists()
+    for loaded in (compiled, warm):
+        assert loaded.skeleton
+        assert len(loaded.presentation.slides) == 0
+        assert [layout.name for layout in loaded.layouts] == [layout.name for layout in loaded.summary.layouts]
+    items = [OutlineItem(title=f"T{i}", bullets=["a"] * i) for i in range(1, 4)]
+    expected = [plan.layout.name for plan in LayoutMatcher(full.summary).iter_match(items)]
+    assert [plan.layout.name for plan in LayoutMatcher(warm.summary).iter_match(items)] == expected
+    assert len(warm.layouts) < len(full.layouts)
+
+    assert cache.invalidate(template)
+    assert not cache.skeleton_path(template).exists()
+
+
+def test_template_cache_misses_when_layout_settings_change(tmp_path, monkeypatch):
+    template = _make_template(tmp_path / "template.pptx")
+    cache = TemplateCache(tmp_path / "cache")
+    cache.get_or_analyze(template)
+
+    monkeypatch.setattr(settings, "COMMON_LAYOUT_ALIASES", {**settings.COMMON_LAYOUT_ALIASES, "blank": "content"})
+    assert cache.get(template) is None
+    assert cache.get_or_analyze(template).layouts[6].kind == "content"
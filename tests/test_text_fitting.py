@@ -0,0 +1,45 @@
+from pptx import Presentation
+
+from agents.layout_matcher import LayoutMatcher
+from agents.outline_manager import OutlineManager, OutlineParser
+from agents.pipeline import render_deck
+from agents.template_loader import load_template
+from agents.text_fitting import TextBox, TextFitter, fitter_for_layout, get_metrics
+from config import settings
+
+
+def test_wrap_breaks_cjk_anywhere_and_latin_at_spaces():
+    metrics = get_metrics(None)  # estimated widths: 1 em per CJK character
+    assert metrics.wrap("市場趨勢聚焦重點", 10, 40) == ["市場趨勢", "聚焦重點"]
+    lines = metrics.wrap("alpha beta gamma", 10, 60)
+    assert lines == ["alpha beta", "gamma"]
+    assert all(len(line) <= 10 for line in metrics.wrap("x" * 25, 10, 60))
+
+
+def test_outline_manager_splits_slides_by_fitted_height():
+    fitter = TextFitter(TextBox(width=400, height=100, font_size=20, font_file=None))
+    short = ",".join(f"b{i}" for i in range(3))
+    long = ",".join("市場趨勢與客戶需求持續成長" * 3 + str(i) for i in range(3))
+    items = OutlineParser.parse([f"Short|{short}", f"Long|{long}"])
+
+    summary = OutlineManager(target_pages=0, fitter=fitter).organize(items)
+
+    assert [item.title for item in summary.items] == ["Short", "Long (Part 1/3)", "Long (Part 2/3)", "Long (Part 3/3)"]
+    assert fitter.chunk_sizes(["a"] * 12, max_items=5) == [4, 4, 4]  # 24 pt per line, 100 pt box
+
+
+def test_default_page_target_never_merges_fitted_parts_into_overflow(tmp_path):
+    template_path = tmp_path / "template.pptx"
+    Presentation().save(template_path)
+    template = load_template(template_path)
+    fitter = fitter_for_layout(template, LayoutMatcher(template.summary).body_layout)
+    long = ",".join(f"Point {i} covers the customer journey from discovery to renewal in detail" for i in range(8))
+
+    deck = render_deck(template, OutlineParser.parse(["Cover|a", f"Long|{long}"]), tmp_path / "out", enable_images=False)
+
+    slides = Presentation(deck.output_path).slides
+    assert len(slides) > 2
+    for slide in slides:
+        body = [shape for shape in slide.placeholders if shape.placeholder_format.idx == 1]
+        paragraphs = [paragraph.text for shape in body for paragraph in shape.text_frame.paragraphs]
+        assert fitter.fits(paragraphs, settings.MAX_BULLETS_PER_SLIDE), slide.shapes.title.text
@@ -0,0 +1,71 @@
+"""Local stub of a bullet expansion service for offline testing of the http backend.
+
+    python -m tools.expansion_stub_server --port 8765 --latency 0.05
+    python ppt_agent.py ... --expansion-backend http --expansion-url http://127.0.0.1:8765/expand
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from agents.expansion import expand_rule
+from core.logging import configure_logging
+
+
+def make_server(host: str = "127.0.0.1", port: int = 0, latency: float = 0.05, failure_rate: float = 0.0):
+    """Build (but do not start) a threaded server; port 0 picks a free port."""
+    lock = threading.Lock()
+    rng = random.Random(0)
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self) -> None:  # noqa: N802 - http.server naming
+            length = int(self.headers.get("Content-Length") or 0)
+            try:
+                bullets = json.loads(self.rfile.read(length).decode("utf-8"))["bullets"]
+            except (ValueError, KeyError, TypeError):
+                self.send_error(400, "expected {\"bullets\": [...]}")
+                return
+            time.sleep(latency)
+            with lock:
+                failed = rng.random() < failure_rate
+            if failed:
+                self.send_error(503, "simulated failure")
+                return
+            body = json.dumps({"sentences": [expand_rule(str(b)) for b in bullets]}, ensure_ascii=False).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args) -> None:  # keep benchmark output quiet
+            return
+
+    return ThreadingHTTPServer((host, port), Handler)
+
+
+def main() -> int:
+    configure_logging()
+    parser = argparse.ArgumentParser(description="Stub bullet expansion service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds to wait before answering each request")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Fraction of requests answered with 503")
+    args = parser.parse_args()
+    server = make_server(args.host, args.port, args.latency, args.failure_rate)
+    print(f"Serving on http://{args.host}:{server.server_address[1]}/expand")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -6,21 +6,58 @@ import json
 from dataclasses import asdict
 from pathlib import Path
 
-from agents.template_analyzer import TemplateAnalyzer
+from core.logging import configure_logging
 
 
 def main() -> int:
+    configure_logging()
     parser = argparse.ArgumentParser(description="Inspect a PPTX template and list layouts")
-    parser.add_argument("template", type=Path, help="Path to template .pptx file")
+    parser.add_argument("templates", nargs="+", type=Path, help="Path(s) to template .pptx files")
+    parser.add_argument("--cache-dir", type=Path, help="Read analyses from (and store them in) this cache")
+    parser.add_argument(
+        "--warm",
+        action="store_true",
+        help="Only populate the cache (analyses and skeleton templates) and report cache statistics",
+    )
+    parser.add_argument(
+        "--invalidate",
+        action="store_true",
+        help="Drop cached analyses for the given templates before inspecting",
+    )
+    parser.add_argument(
+        "--full-parse",
+        action="store_true",
+        help="Analyze through python-pptx instead of reading only the layout XML from the package",
+    )
     args = parser.parse_args()
-
-    analyzer = TemplateAnalyzer(args.template)
-    summary = analyzer.analyze()
-    payload = [asdict(layout) for layout in summary.layouts]
+    if (args.warm or args.invalidate) and args.cache_dir is None:
+        parser.error("--warm and --invalidate require --cache-dir")
+
+    from agents.template_analyzer import TemplateAnalyzer
+    from agents.template_cache import TemplateCache
+
+    cache = TemplateCache(args.cache_dir) if args.cache_dir else None
+    results = {}
+    for template in args.templates:
+        if cache is None:
+            summary = TemplateAnalyzer(template, fast=not args.full_parse).analyze()
+        else:
+            if args.invalidate:
+                cache.invalidate(template)
+            summary = cache.get_or_analyze(template, fast=not args.full_parse)
+            if args.warm and not cache.skeleton_path(template).exists():
+                from agents.template_loader import load_template
+
+                load_template(template, cache=cache, skeleton=True)
+        results[str(template)] = [asdict(layout) for layout in summary.layouts]
+
+    if args.warm:
+        print(json.dumps(cache.stats(), indent=2))
+        return 0
+    payload = results[str(args.templates[0])] if len(args.templates) == 1 else results
     print(json.dumps(payload, ensure_ascii=False, indent=2))
     return 0
 
 
 if __name__ == "__main__":
     raise SystemExit(main())
-